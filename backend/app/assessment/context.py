@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import DefaultDict, Dict, List, Optional, Set
+import networkx as nx
+
+from app.schemas.flowchart import FlowchartDataSchema
+
+@dataclass(slots=True)
+class AnalysisNode:
+    """
+    The node fields analysis rules read, copied out of the Pydantic schema once per flowchart.
+    Attribute reads on a slotted dataclass are several times cheaper than on a BaseModel.
+    """
+    id: str
+    type: Optional[str]
+    value: Optional[str]
+
+class AnalysisContext:
+    """
+    Per-request cache of data derived from a flowchart that several analysis rules need.
+
+    One context is built by the dispatcher for each analyzed flowchart and handed to every rule,
+    so lookups and graph traversals are computed at most once no matter how many rules use them.
+    Everything is computed lazily on first access, which keeps rules themselves close to pure logic
+    over these precomputed views. Returned collections are shared between rules and must not be mutated.
+    """
+
+    def __init__(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph):
+        self.flowchart_data = flowchart_data
+        self.graph = graph
+
+    def warm_up(self) -> None:
+        """
+        Computes every cached view up front. Used before rules run concurrently, so the threads
+        only ever read the shared views and never race to build them.
+        """
+        for name in ('nodes', 'id_to_node', 'type_to_ids', 'reachable_from_starts', 'in_degree', 'out_degree',
+                     'sccs', 'condensation', 'topological_order', 'max_decisions_to'):
+            getattr(self, name)
+
+    @cached_property
+    def nodes(self) -> List[AnalysisNode]:
+        """The flowchart's nodes in their original order."""
+        return [AnalysisNode(node.id, node.type, node.value) for node in self.flowchart_data.nodes]
+
+    @cached_property
+    def id_to_node(self) -> Dict[str, AnalysisNode]:
+        """Maps node IDs to nodes. If several nodes share an ID, the first one wins."""
+        id_to_node: Dict[str, AnalysisNode] = {}
+        for node in self.nodes:
+            id_to_node.setdefault(node.id, node)
+        return id_to_node
+
+    @cached_property
+    def type_to_ids(self) -> DefaultDict[str, Set[str]]:
+        """Buckets node IDs by node type. Nodes without a type are bucketed under None."""
+        type_to_ids: DefaultDict[str, Set[str]] = defaultdict(set)
+        for node in self.nodes:
+            type_to_ids[node.type].add(node.id)
+        return type_to_ids
+
+    @cached_property
+    def reachable_from_starts(self) -> Set[str]:
+        """All nodes reachable from any start node (start nodes included), found in one traversal."""
+        stack = [node_id for node_id in self.type_to_ids['start'] if self.graph.has_node(node_id)]
+        reachable = set(stack)
+        while stack:
+            for successor_id in self.graph.successors(stack.pop()):
+                if successor_id not in reachable:
+                    reachable.add(successor_id)
+                    stack.append(successor_id)
+        return reachable
+
+    @cached_property
+    def in_degree(self) -> Dict[str, int]:
+        """Number of incoming edges per node ID."""
+        return dict(self.graph.in_degree())
+
+    @cached_property
+    def out_degree(self) -> Dict[str, int]:
+        """Number of outgoing edges per node ID."""
+        return dict(self.graph.out_degree())
+
+    @cached_property
+    def sccs(self) -> List[Set[str]]:
+        """The strongly connected components of the graph."""
+        return list(nx.strongly_connected_components(self.graph))
+
+    @cached_property
+    def condensation(self) -> nx.DiGraph:
+        """
+        The DAG of strongly connected components. `condensation.graph['mapping']` maps node IDs
+        to component indices and each component lists its node IDs in the 'members' attribute.
+        """
+        return nx.condensation(self.graph, self.sccs)
+
+    @cached_property
+    def topological_order(self) -> List[int]:
+        """The component indices of the condensation in topological order."""
+        return list(nx.topological_sort(self.condensation))
+
+    def nodes_reaching(self, target_ids: Set[str], forward: bool = True) -> Set[str]:
+        """
+        The IDs of all nodes with a path of at least one edge to a node in `target_ids` (or from
+        one, when `forward` is False).
+
+        Answers the question for every node at once with one boolean per component, propagated
+        over the condensation in (reverse) topological order, instead of a traversal per node.
+        """
+        cond = self.condensation
+        scc_of = cond.graph['mapping']
+        target_sccs = {scc_of[node_id] for node_id in target_ids if node_id in scc_of}
+        neighbors = cond.successors if forward else cond.predecessors
+        order = reversed(self.topological_order) if forward else self.topological_order
+
+        flagged: Set[int] = set()
+        for scc in order:
+            if scc in target_sccs:
+                members = cond.nodes[scc]['members']
+                # Inside a loop body every member, the target itself included, reaches the target
+                if len(members) > 1 or any(self.graph.has_edge(node_id, node_id) for node_id in members):
+                    flagged.add(scc)
+                    continue
+            if any(neighbor in flagged or neighbor in target_sccs for neighbor in neighbors(scc)):
+                flagged.add(scc)
+
+        return {node_id for node_id, scc in scc_of.items() if scc in flagged}
+
+    @cached_property
+    def max_decisions_to(self) -> Dict[str, int]:
+        """
+        For every node reachable from a start node, the largest number of decisions passed through
+        before reaching it.
+
+        A single longest-path relaxation over the condensation in topological order, instead of an
+        enumeration of all simple paths. Every decision inside a loop body counts towards the depth
+        of what follows it.
+        """
+        cond = self.condensation
+        scc_of = cond.graph['mapping']
+        # Count decisions per component from the (usually few) decision IDs rather than scanning every member
+        decisions_in = Counter(scc_of[node_id] for node_id in self.type_to_ids['decision'] if node_id in scc_of)
+        max_decisions_to: Dict[int, int] = {
+            scc_of[start_id]: 0 for start_id in self.type_to_ids['start'] if start_id in scc_of
+        }
+
+        for scc in self.topological_order:
+            if scc not in max_decisions_to:
+                continue  # Not reachable from any start node
+            depth = max_decisions_to[scc] + decisions_in[scc]
+            for successor in cond.successors(scc):
+                if max_decisions_to.get(successor, -1) < depth:
+                    max_decisions_to[successor] = depth
+
+        return {node_id: max_decisions_to[scc] for node_id, scc in scc_of.items() if scc in max_decisions_to}
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import List, Optional, Sequence
+import networkx as nx
+
+from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
+from app.assessment.interfaces import AnalysisRule
+from app.assessment.context import AnalysisContext
+from app.core.config import assessment_config
+
+# Created on first use and shared by all requests, so threads are not spawned per flowchart
+_rule_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_rule_executor() -> ThreadPoolExecutor:
+    global _rule_executor
+    if _rule_executor is None:
+        _rule_executor = ThreadPoolExecutor(max_workers=assessment_config.rule_workers, thread_name_prefix="analysis-rule")
+    return _rule_executor
+
+def _apply_rule(rule: AnalysisRule, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
+    try:
+        # Pass the Pydantic model, the NetworkX graph and the shared context to the rule
+        return rule.apply(flowchart_data, graph, ctx)
+    except Exception as e:
+        rule_name = type(rule).__name__
+        # Log the exception from the rule appropriately in a real application
+        print(f"Error during rule execution '{rule_name}': {e}")
+        # Report the failure as a system error result; the remaining rules still run
+        return [AnalysisResult(
+            rule_id="RULE_EXECUTION_ERROR",
+            message=f"Rule '{rule_name}' failed to execute: {str(e)}",
+            severity="system_error",
+            elements=() # No specific elements, as it's a rule system error
+        )]
+
+def run_analysis_rules(rules: Sequence[AnalysisRule], flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    """
+    Applies each rule to the flowchart and collects their results in rule order.
+
+    The rules share a single AnalysisContext, so graph-wide work such as strongly connected
+    components, reachability from the start nodes or node degrees is done once per flowchart
+    rather than once per rule. When `assessment_config.rule_workers` is greater than 1, the rules
+    are dispatched to a shared thread pool after the context has been fully computed.
+
+    Args:
+        rules: The analysis rules to apply.
+        flowchart_data: The structured Pydantic representation of the flowchart.
+        graph: The NetworkX DiGraph representation of the flowchart.
+
+    Returns:
+        The combined results of all rules. A rule that raises is reported as a
+        RULE_EXECUTION_ERROR result and does not prevent the remaining rules from running.
+    """
+    ctx = AnalysisContext(flowchart_data, graph)
+
+    if assessment_config.rule_workers > 1 and len(rules) > 1:
+        ctx.warm_up()
+        executor = _get_rule_executor()
+        futures = [executor.submit(_apply_rule, rule, flowchart_data, graph, ctx) for rule in rules]
+        results_per_rule = [future.result() for future in futures]
+    else:
+        results_per_rule = [_apply_rule(rule, flowchart_data, graph, ctx) for rule in rules]
+
+    return list(chain.from_iterable(results_per_rule))
@@ -4,6 +4,7 @@ import networkx as nx
 
 # from typing import Any, Dict # No longer needed for these specific types
 from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
+from app.assessment.context import AnalysisContext
 
 class AnalysisRule(ABC):
     """
@@ -11,13 +12,14 @@ class AnalysisRule(ABC):
     """
 
     @abstractmethod
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         """
         Applies the analysis rule to the given flowchart data and its graph representation.
 
         Args:
             flowchart_data: The structured Pydantic representation of the flowchart.
             graph: The NetworkX DiGraph representation of the flowchart.
+            ctx: Lookups and traversals shared by all rules applied to this flowchart.
 
         Returns:
             A list of analysis results (e.g., errors, warnings, suggestions).
@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, Set
 import networkx as nx
 
 from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
 from app.assessment.interfaces import AnalysisRule
+from app.assessment.context import AnalysisContext
+from app.core.config import assessment_config
 
 class InfiniteLoopRule(AnalysisRule):
     '''
@@ -10,79 +12,105 @@ class InfiniteLoopRule(AnalysisRule):
     A valid loop (like for/while) must contain a decision node that has at least one path leading outside the loop.
     '''
 
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         '''
         Applies the infinite loop detection rule.
 
         Args:
             flowchart_data: The structured Pydantic representation of the flowchart.
             graph: The NetworkX DiGraph representation of the flowchart.
+            ctx: Lookups and traversals shared by all rules applied to this flowchart.
 
         Returns:
             A list of AnalysisResult objects if infinite loops are detected, otherwise an empty list.
         '''
         results: List[AnalysisResult] = []
-        try:
-            cycles = list(nx.simple_cycles(graph))
-            
-            for cycle_nodes in cycles:
-                cycle_set = set(cycle_nodes)
-                has_exit = False
-                
+        decision_ids = ctx.type_to_ids['decision']
+
+        if not self.has_any_cycle(graph):
+            return results
+
+        for loop_body in self._loop_bodies(graph, ctx.sccs):
+            body_decisions = loop_body & decision_ids
+            # A decision branching out of the whole loop body is an exit of every cycle through it.
+            # Only cycles without such a decision need a membership test against their own nodes.
+            body_exits = {
+                decision_node_id for decision_node_id in body_decisions
+                if any(successor_id not in loop_body for successor_id in graph.successors(decision_node_id))
+            }
+
+            for cycle_nodes in nx.simple_cycles(graph.subgraph(loop_body)):
                 # Check for any decision node within the cycle
-                decision_nodes_in_cycle = [
-                    node_id for node_id in cycle_nodes
-                    if any(n.id == node_id and n.type == 'decision' for n in flowchart_data.nodes)
-                ]
+                decision_nodes_in_cycle = [node_id for node_id in cycle_nodes if node_id in body_decisions]
 
                 if not decision_nodes_in_cycle:
                     # If there's no decision node, it's a simple, unconditional loop.
                     has_exit = False
+                elif any(decision_node_id in body_exits for decision_node_id in decision_nodes_in_cycle):
+                    has_exit = True
                 else:
-                    # Check if any decision node has a path out of the cycle
-                    for decision_node_id in decision_nodes_in_cycle:
-                        successors = graph.successors(decision_node_id)
-                        for successor_id in successors:
-                            if successor_id not in cycle_set:
-                                has_exit = True
-                                break
-                        if has_exit:
-                            break
-                
+                    # Check if any decision node has a path out of the cycle into the rest of the loop body
+                    cycle_set = set(cycle_nodes)
+                    has_exit = any(
+                        successor_id not in cycle_set
+                        for decision_node_id in decision_nodes_in_cycle
+                        for successor_id in graph.successors(decision_node_id)
+                    )
+
                 if not has_exit:
-                    elements_involved = [str(node_id) for node_id in cycle_nodes]
-                    primary_element_repr = f"loop starting around node '{elements_involved[0]}'"
-                    
+                    # simple_cycles yields a fresh list of node IDs (already strings) per cycle
+                    elements_involved = cycle_nodes
+
                     results.append(AnalysisResult(
                         rule_id="MISSING_LOOP_EXIT",
                         message=f"A potential infinite loop was detected. The identified loop does not appear to have a clear exit condition. Path: {' -> '.join(elements_involved)}",
                         severity="error",
                         elements=elements_involved
                     ))
+                    if not assessment_config.exhaustive_cycles:
+                        break  # One offending cycle is enough to point the student at this loop body
 
-        except Exception as e:
-            # Log error or handle appropriately
-            print(f"Error during InfiniteLoopRule execution: {e}")
-            results.append(AnalysisResult(
-                rule_id="RULE_EXECUTION_ERROR",
-                message=f"InfiniteLoopRule failed to execute: {str(e)}",
-                severity="system_error",
-                elements=[]
-            ))
-        return results 
+        return results
+
+    @staticmethod
+    def has_any_cycle(graph: nx.DiGraph) -> bool:
+        '''
+        Returns True if the graph contains at least one cycle. Runs in O(V+E), so callers that only
+        need to know whether a flowchart loops at all can avoid enumerating cycles.
+        '''
+        try:
+            nx.find_cycle(graph, orientation='original')
+        except nx.NetworkXNoCycle:
+            return False
+        return True
+
+    @staticmethod
+    def _loop_bodies(graph: nx.DiGraph, sccs: List[Set[str]]):
+        '''
+        Yields the strongly connected components that contain a cycle. Cycles can never span two
+        components, so trivial components (a single node without a self-loop) are skipped and cycle
+        enumeration can be confined to a subgraph view of each loop body.
+        '''
+        for scc in sccs:
+            if len(scc) == 1:
+                node_id = next(iter(scc))
+                if not graph.has_edge(node_id, node_id):
+                    continue
+            yield scc
 
 class UnreachableCodeRule(AnalysisRule):
     '''
     Identifies nodes in the flowchart that are unreachable from any start node.
     '''
 
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         '''
         Applies the unreachable code detection rule.
 
         Args:
             flowchart_data: The structured Pydantic representation of the flowchart.
             graph: The NetworkX DiGraph representation of the flowchart.
+            ctx: Lookups and traversals shared by all rules applied to this flowchart.
 
         Returns:
             A list of AnalysisResult objects if unreachable nodes are detected.
@@ -92,32 +120,21 @@ class UnreachableCodeRule(AnalysisRule):
             return results # No nodes, so nothing is unreachable
 
         # Use the enhanced type detection from the frontend parser
-        start_node_ids = [
-            node.id for node in flowchart_data.nodes 
-            if node.type == 'start'
-        ]
+        start_node_ids = ctx.type_to_ids['start']
 
         if not start_node_ids:
             # If no start nodes are identified, this rule cannot determine reachability.
             # Other rules (like SingleStartMultipleEndRule) should handle missing start nodes.
             return results
 
-        all_reachable_nodes = set()
-        for start_node_id in start_node_ids:
-            if graph.has_node(start_node_id):
-                # Perform a traversal (e.g., DFS or BFS) from this start node
-                reachable_from_this_start = nx.dfs_predecessors(graph, source=start_node_id)
-                all_reachable_nodes.add(start_node_id) # Add the start node itself
-                all_reachable_nodes.update(reachable_from_this_start.keys())
-                # DFS predecessors doesn't give all nodes in a DAG, rather a tree. Use descendants.
-                all_reachable_nodes.update(nx.descendants(graph, start_node_id))
-
+        # A single traversal from all start nodes at once
+        all_reachable_nodes = ctx.reachable_from_starts
 
-        all_node_ids = {node.id for node in flowchart_data.nodes}
-        unreachable_node_ids = all_node_ids - all_reachable_nodes
+        id_to_node = ctx.id_to_node
+        unreachable_node_ids = [node_id for node_id in id_to_node if node_id not in all_reachable_nodes]
 
         for node_id in unreachable_node_ids:
-            node_info = next((n for n in flowchart_data.nodes if n.id == node_id), None)
+            node_info = id_to_node.get(node_id)
             node_repr = f"'{node_info.value}' (ID: {node_id})" if node_info and node_info.value else f"element (ID: {node_id})"
             
             # Avoid flagging end nodes that are correctly identified by SingleStartMultipleEndRule if they become "unreachable"
@@ -129,7 +146,7 @@ class UnreachableCodeRule(AnalysisRule):
                 rule_id="UNREACHABLE_CODE",
                 message=f"The {node_repr} is unreachable from any start node.",
                 severity="warning",
-                elements=[node_id]
+                elements=(node_id,)
             ))
         
         return results
@@ -141,20 +158,21 @@ class ParallelBranchBalanceRule(AnalysisRule):
     A single branch is a warning, as it makes the decision redundant. More than two is also a warning. No branches is an error.
     """
 
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         """
         Applies the parallel branch balance rule.
 
         Args:
             flowchart_data: The structured Pydantic representation of the flowchart.
             graph: The NetworkX DiGraph representation of the flowchart.
+            ctx: Lookups and traversals shared by all rules applied to this flowchart.
 
         Returns:
             A list of AnalysisResult objects for any decision nodes with imbalanced branches.
         """
         results: List[AnalysisResult] = []
         
-        decision_nodes = [node for node in flowchart_data.nodes if node.type == 'decision']
+        decision_nodes = [node for node in ctx.nodes if node.type == 'decision']
 
         for node in decision_nodes:
             if not graph.has_node(node.id):
@@ -168,14 +186,14 @@ class ParallelBranchBalanceRule(AnalysisRule):
                     rule_id="DECISION_NO_BRANCHES",
                     message=f"The {node_repr} is a dead end. Decision nodes must have exit paths.",
                     severity="error",
-                    elements=[node.id]
+                    elements=(node.id,)
                 ))
             elif out_degree == 1:
                 results.append(AnalysisResult(
                     rule_id="DECISION_SINGLE_BRANCH",
                     message=f"The {node_repr} has only one exit path. A decision should offer at least two alternative branches to be meaningful.",
                     severity="warning",
-                    elements=[node.id]
+                    elements=(node.id,)
                 ))
             # We are not checking for > 2 for now, as some valid structures like switch-case might use this.
             # This can be a future pedagogical rule.
@@ -189,14 +207,17 @@ class OrphanedIoRule(AnalysisRule):
     This suggests the I/O operation is disconnected from the core logic.
     """
 
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         """
         Applies the orphaned I/O rule.
         """
         results: List[AnalysisResult] = []
         
-        io_nodes = [node for node in flowchart_data.nodes if node.type in ['input', 'output']]
-        process_or_decision_types = {'process', 'decision'}
+        io_nodes = [node for node in ctx.nodes if node.type in ['input', 'output']]
+        process_or_decision_ids = ctx.type_to_ids['process'] | ctx.type_to_ids['decision']
+        # Reachability of the logic nodes is resolved for all I/O nodes at once, each direction only when needed
+        nodes_with_downstream_logic = ctx.nodes_reaching(process_or_decision_ids) if ctx.type_to_ids['input'] else set()
+        nodes_with_upstream_logic = ctx.nodes_reaching(process_or_decision_ids, forward=False) if ctx.type_to_ids['output'] else set()
 
         for node in io_nodes:
             if not graph.has_node(node.id):
@@ -206,42 +227,26 @@ class OrphanedIoRule(AnalysisRule):
 
             if node.type == 'input':
                 # Check if any successor path eventually hits a process/decision node
-                has_downstream_logic = False
-                try:
-                    descendants = nx.descendants(graph, node.id)
-                    for desc_id in descendants:
-                        desc_node = next((n for n in flowchart_data.nodes if n.id == desc_id), None)
-                        if desc_node and desc_node.type in process_or_decision_types:
-                            has_downstream_logic = True
-                            break
-                    if not has_downstream_logic and descendants: # It has successors, but none are logic
-                         results.append(AnalysisResult(
-                            rule_id="ORPHAN_INPUT",
-                            message=f"Input from {node_repr} is never used in a process or decision.",
-                            severity="warning",
-                            elements=[node.id]
-                        ))
-                except nx.NetworkXError:
-                    pass # Should not happen if node is in graph
+                has_downstream_logic = node.id in nodes_with_downstream_logic
+                has_successors = any(successor_id != node.id for successor_id in graph.successors(node.id))
+                if not has_downstream_logic and has_successors: # It has successors, but none are logic
+                    results.append(AnalysisResult(
+                        rule_id="ORPHAN_INPUT",
+                        message=f"Input from {node_repr} is never used in a process or decision.",
+                        severity="warning",
+                        elements=(node.id,)
+                    ))
 
             elif node.type == 'output':
                 # Check if any predecessor path originates from a process/decision node
-                has_upstream_logic = False
-                try:
-                    ancestors = nx.ancestors(graph, node.id)
-                    for anc_id in ancestors:
-                        anc_node = next((n for n in flowchart_data.nodes if n.id == anc_id), None)
-                        if anc_node and anc_node.type in process_or_decision_types:
-                            has_upstream_logic = True
-                            break
-                    if not has_upstream_logic and ancestors: # It has predecessors, but none are logic
-                        results.append(AnalysisResult(
-                            rule_id="ORPHAN_OUTPUT",
-                            message=f"Output to {node_repr} does not seem to originate from any process or decision.",
-                            severity="warning",
-                            elements=[node.id]
-                        ))
-                except nx.NetworkXError:
-                    pass # Should not happen if node is in graph
+                has_upstream_logic = node.id in nodes_with_upstream_logic
+                has_predecessors = any(predecessor_id != node.id for predecessor_id in graph.predecessors(node.id))
+                if not has_upstream_logic and has_predecessors: # It has predecessors, but none are logic
+                    results.append(AnalysisResult(
+                        rule_id="ORPHAN_OUTPUT",
+                        message=f"Output to {node_repr} does not seem to originate from any process or decision.",
+                        severity="warning",
+                        elements=(node.id,)
+                    ))
 
         return results 
\ No newline at end of file
@@ -3,6 +3,7 @@ import networkx as nx
 
 from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
 from app.assessment.interfaces import AnalysisRule
+from app.assessment.context import AnalysisContext
 
 class DecisionNestingDepthRule(AnalysisRule):
     """
@@ -12,7 +13,7 @@ class DecisionNestingDepthRule(AnalysisRule):
     """
     MAX_DEPTH = 3  # Configurable threshold for nesting
 
-    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> List[AnalysisResult]:
+    def apply(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, ctx: AnalysisContext) -> List[AnalysisResult]:
         """
         Applies the decision nesting depth rule.
         """
@@ -20,26 +21,22 @@ class DecisionNestingDepthRule(AnalysisRule):
         if not graph.nodes():
             return results
 
-        start_node_ids = [node.id for node in flowchart_data.nodes if node.type == 'start']
-        if not start_node_ids:
+        if not ctx.type_to_ids['start']:
             return results
 
-        decision_nodes = [node for node in flowchart_data.nodes if node.type == 'decision']
+        decision_nodes = [node for node in ctx.nodes if node.type == 'decision']
+        if len(ctx.type_to_ids['decision']) <= self.MAX_DEPTH:
+            # A decision needs MAX_DEPTH other decisions before it, so no longest-path pass is needed
+            return results
+
+        max_decisions_to = ctx.max_decisions_to
 
         for decision_node in decision_nodes:
             if not graph.has_node(decision_node.id):
                 continue
 
-            max_depth = 0
-            # Find the longest path from any start node to this decision node
-            for start_id in start_node_ids:
-                if nx.has_path(graph, start_id, decision_node.id):
-                    # Consider all simple paths to find the one with the most decisions
-                    for path in nx.all_simple_paths(graph, source=start_id, target=decision_node.id):
-                        # Count how many nodes in this path are decisions (excluding the current one)
-                        path_decisions = sum(1 for node_id in path[:-1] if any(n.id == node_id and n.type == 'decision' for n in flowchart_data.nodes))
-                        if path_decisions > max_depth:
-                            max_depth = path_decisions
+            # Decisions preceding this node on the longest path from any start node.
+            max_depth = max_decisions_to.get(decision_node.id, 0)
             
             # The nesting depth is the number of preceding decisions.
             # If current node is a decision, its depth is max_depth.
@@ -51,7 +48,7 @@ class DecisionNestingDepthRule(AnalysisRule):
                     rule_id="DEEP_NESTING",
                     message=f"The {node_repr} is nested deeply ({nesting_depth + 1} levels). Consider simplifying the logic to improve readability.",
                     severity="info", # Pedagogical feedback is often informational
-                    elements=[decision_node.id]
+                    elements=(decision_node.id,)
                 ))
 
-        return results 
\ No newline at end of file
+        return results
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, List, Optional
+
+from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
+
+class AnalysisResultCache:
+    """
+    Least-recently-used cache of analysis results for flowcharts that are submitted again unchanged,
+    which students do often while iterating on a diagram.
+
+    One cache must only ever be used with a single set of rules, since the rules are not part of the key.
+    Cached results are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, List[AnalysisResult]]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def key_for(flowchart_data: FlowchartDataSchema) -> Hashable:
+        """
+        Builds the cache key of a flowchart from everything the rules read: the ID, type and value
+        of each node and the endpoints of each edge. Both are kept in submission order, because the
+        order of the reported results follows it.
+        """
+        return (
+            tuple((node.id, node.type, node.value) for node in flowchart_data.nodes),
+            tuple((edge.sourceId, edge.targetId) for edge in flowchart_data.edges),
+        )
+
+    def get(self, key: Hashable) -> Optional[List[AnalysisResult]]:
+        """Returns the cached results for `key`, or None if the flowchart has not been analyzed yet."""
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                return None
+            self._entries.move_to_end(key)
+        return list(results)
+
+    def put(self, key: Hashable, results: List[AnalysisResult]) -> None:
+        """Stores the results for `key`, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = list(results)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops all cached results, e.g. after the rules or the schema change."""
+        with self._lock:
+            self._entries.clear()
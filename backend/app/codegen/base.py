@@ -1,58 +1,229 @@
 from app.schemas.flowchart import FlowchartNodeSchema
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import re
+import string
+
+# Compiled once at import instead of going through re's pattern cache on every call
+_NON_IDENTIFIER_CHARS_RE = re.compile(r'[^a-zA-Z0-9_]')
+_REPEATED_UNDERSCORES_RE = re.compile(r'_{2,}')
+# Byte table mapping everything but [a-zA-Z0-9_] to '_', for cleaning ASCII identifiers without the regex engine
+_IDENTIFIER_CHARS = string.ascii_letters + string.digits + '_'
+_IDENTIFIER_TRANSLATION = bytes(byte if chr(byte) in _IDENTIFIER_CHARS else ord('_') for byte in range(256))
+# Words followed by an assignment or following a declaration or I/O keyword,
+# e.g. "x = 10", "set value", "input name", "print result"
+_ASSIGNMENT_PATTERN = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=')  # Assignment: my_var = ...
+_KEYWORD_VARIABLE_PATTERNS = (
+    re.compile(r'(?:let|set|const|var)\s+([a-zA-Z_][a-zA-Z0-9_]*)'), # Declaration: let my_var
+    re.compile(r'(?:input|read|get|enter)\s+([a-zA-Z_][a-zA-Z0-9_]*)'),  # Input: input my_var
+    re.compile(r'(?:print|display|show|output)\s+([a-zA-Z_][a-zA-Z0-9_]*)'),  # Output: print my_var
+)
+# Fixed HTML fragments used when wrapping generated lines
+_COMMENT_SPAN_OPEN = '<span style="color: #666666;">'
+_SPAN_CLOSE = '</span>'
+# Joins the lines of an educational comment
+_COMMENT_LINE_SEPARATOR = "\n    // "
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+[^\s<>"{}|\\^`\[\].,;:!?]')
+
+@lru_cache(maxsize=2048)
+def _clean_identifier_text(text: str) -> str:
+    """
+    Converts arbitrary flowchart text into a valid, safe programming identifier.
+    Memoized, since the same few names recur across the nodes of a flowchart and between requests.
+    """
+    if not text:
+        return "unnamed_variable"
+    
+    # Keep only letters, numbers, and underscores. Surrounding whitespace becomes underscores
+    # that are stripped below, so the text is not stripped separately first.
+    if text.isascii():
+        cleaned = text.encode('ascii').translate(_IDENTIFIER_TRANSLATION).decode('ascii')
+    else:
+        cleaned = _NON_IDENTIFIER_CHARS_RE.sub('_', text)
+    # Collapse multiple consecutive underscores
+    if '__' in cleaned:
+        cleaned = _REPEATED_UNDERSCORES_RE.sub('_', cleaned)
+    # Remove leading/trailing underscores
+    cleaned = cleaned.strip('_')
+    
+    # Ensure the identifier does not start with a number
+    if not cleaned or cleaned[0].isdigit():
+        cleaned = f"var_{cleaned}" if cleaned else "unnamed_variable"
+        
+    return cleaned[:50]  # Enforce a reasonable length limit
+
+@lru_cache(maxsize=4096)
+def _variables_in_text(text: str) -> Tuple[str, ...]:
+    """
+    Returns the unique cleaned variable names found in node text, sorted.
+    Memoized, since the generators look at every node text twice (once to declare the variables,
+    once to emit the node) and texts repeat within and across flowcharts. The result is shared
+    between callers, hence a tuple.
+    """
+    if not text:
+        return ()
+    
+    lowered = text.lower()
+    variables = []
+    # Most node texts contain no '=', so the assignment pattern can usually be skipped
+    if '=' in lowered:
+        variables.extend(_ASSIGNMENT_PATTERN.findall(lowered))
+    for pattern in _KEYWORD_VARIABLE_PATTERNS:
+        # Find all non-overlapping matches
+        variables.extend(pattern.findall(lowered))
+    
+    # Clean and return unique variables
+    return tuple(sorted({_clean_identifier_text(var) for var in variables if var}))
+
+@lru_cache(maxsize=256)
+def _readable_color(color: str) -> str:
+    """
+    Ensures a color is dark enough to be readable on a white background.
+    Converts light colors to darker, more readable versions.
+    Memoized, since a flowchart only uses a handful of node colors.
+    """
+    if not color or not color.startswith('#'):
+        return '#333333'  # Default dark gray
+    
+    try:
+        # Remove the # and convert to RGB
+        hex_color = color[1:]
+        if len(hex_color) == 3:
+            # Expand 3-digit hex to 6-digit
+            hex_color = hex_color[0] * 2 + hex_color[1] * 2 + hex_color[2] * 2
+        
+        if len(hex_color) != 6:
+            return '#333333'
+        
+        # Convert to RGB values
+        r, g, b = bytes.fromhex(hex_color)
+        
+        # Calculate luminance (perceived brightness), in integer thousandths of a channel value
+        luminance = 299 * r + 587 * g + 114 * b
+        
+        # Check for problematic bright colors and handle them specially
+        # Bright green, bright yellow, bright cyan, bright magenta, etc.
+        if (r > 200 and g > 200) or (g > 200 and b > 200) or (r > 200 and b > 200):
+            # Very bright colors - darken significantly
+            r = max(0, min(120, r * 3 // 10))
+            g = max(0, min(120, g * 3 // 10))
+            b = max(0, min(120, b * 3 // 10))
+            return f'#{r:02x}{g:02x}{b:02x}'
+        
+        # If too light (luminance above half of 255 * 1000), darken it
+        elif luminance > 127_500:
+            # Darken by reducing RGB values
+            r = max(0, r // 2)
+            g = max(0, g // 2)
+            b = max(0, b // 2)
+            return f'#{r:02x}{g:02x}{b:02x}'
+        
+        # If reasonably dark, use as-is
+        return color
+        
+    except ValueError:
+        return '#333333'  # Fallback to dark gray
+
+@lru_cache(maxsize=256)
+def _subtle_background(color: str) -> str:
+    """
+    Creates a very subtle background color based on the node color.
+    This provides visual connection without overwhelming the text.
+    Memoized like _readable_color.
+    """
+    if not color or not color.startswith('#'):
+        return 'rgba(240, 240, 240, 0.1)'  # Very light gray
+    
+    try:
+        # Remove the # and convert to RGB
+        hex_color = color[1:]
+        if len(hex_color) == 3:
+            # Expand 3-digit hex to 6-digit
+            hex_color = hex_color[0] * 2 + hex_color[1] * 2 + hex_color[2] * 2
+        
+        if len(hex_color) != 6:
+            return 'rgba(240, 240, 240, 0.1)'
+        
+        # Convert to RGB values
+        r, g, b = bytes.fromhex(hex_color)
+        
+        # Create a very subtle background (5% opacity)
+        return f'rgba({r}, {g}, {b}, 0.05)'
+        
+    except ValueError:
+        return 'rgba(240, 240, 240, 0.1)'
+
+# Node colors the frontend assigns: its light gray default and the named Draw.io fill colors
+_FRONTEND_NODE_COLORS = (
+    '#f0f0f0', '#ff0000', '#0000ff', '#00ff00', '#ffff00', '#ffa500',
+    '#800080', '#ffc0cb', '#00ffff', '#ffffff', '#000000',
+)
+
+@lru_cache(maxsize=256)
+def _color_styles(color: str) -> Tuple[str, str]:
+    """
+    Returns the readable text color and the subtle background color for a node color.
+    """
+    return _readable_color(color), _subtle_background(color)
+
+@lru_cache(maxsize=256)
+def _code_line_span_open(color: str) -> str:
+    """
+    Returns the opening span tag that colors a line of generated code after its node's color.
+    """
+    readable_color, bg_color = _color_styles(color)
+    # Add a subtle background color and left border for visual connection
+    style = f"color: {readable_color}; background-color: {bg_color}; border-left: 3px solid {readable_color}; padding-left: 8px; margin-left: -8px;"
+    return f'<span style="{style}">'
+
+@lru_cache(maxsize=256)
+def _step_header_span_open(color: str) -> str:
+    """
+    Returns the opening tag of the header span that introduces each step of the generated code.
+    """
+    readable_color, bg_color = _color_styles(color)
+    style = f"color: {readable_color}; background-color: {bg_color}; border: 2px solid {readable_color}; padding: 4px 8px; font-weight: bold; border-radius: 4px;"
+    return f'<span style="{style}">'
+
+# Resolve the frontend's palette up front, so typical flowcharts never run the color math per request
+for _node_color in _FRONTEND_NODE_COLORS:
+    _code_line_span_open(_node_color)
+    _step_header_span_open(_node_color)
 
 class EducationalCodeGeneratorBase:
     """
     Provides base functionality for educational code generators, including
     identifier cleaning, variable extraction, and educational comment generation.
     """
+
+    __slots__ = ()
+    
+    # Basic explanations with hyperlinks to educational resources, per node type
+    _COMMENTS = {
+        'start': "🚀 Let's start here! This is like turning on your flowchart.\n    // Basic concept: Programs run from top to bottom, line by line.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming",
+        'end': "🏁 Program finished! This is where we stop.\n    // Basic concept: Every program needs a clear ending point.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming",
+        'process': "⚙️ Processing step: This does work or calculations.\n    // Basic concept: Variables are like boxes that hold information.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables",
+        'input': "📥 Getting information: This asks the user for data.\n    // Basic concept: Input is how we get information from users.\n    // Learn more: https://developer.mozilla.org/en-US/docs/Learn/JavaScript/First_steps/What_is_JavaScript#user_input",
+        'output': "📤 Showing results: This displays information to the user.\n    // Basic concept: Output is how we show results to users.\n    // Learn more: https://developer.mozilla.org/en-US/docs/Learn/JavaScript/First_steps/What_is_JavaScript#output",
+        'decision': "🤔 Making a choice: This asks a yes/no question.\n    // Basic concept: Decisions are like yes/no questions in real life.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/logic-if-statements/a/intro-to-if-statements"
+    }
+    _DEFAULT_COMMENT = "📋 A general step in the process.\n    // Basic concept: Every step in a program does something specific.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming"
+    # Each comment with the separator that precedes the node-specific lines already appended
+    _RENDERED_COMMENTS = {node_type: comment + _COMMENT_LINE_SEPARATOR for node_type, comment in _COMMENTS.items()}
+    _RENDERED_DEFAULT_COMMENT = _DEFAULT_COMMENT + _COMMENT_LINE_SEPARATOR
     
     def _clean_identifier(self, text: str) -> str:
         """
         Converts arbitrary flowchart text into a valid, safe programming identifier.
         """
-        if not text:
-            return "unnamed_variable"
-        
-        # Keep only letters, numbers, and underscores
-        cleaned = re.sub(r'[^a-zA-Z0-9_]', '_', text.strip())
-        # Collapse multiple consecutive underscores
-        cleaned = re.sub(r'_{2,}', '_', cleaned)
-        # Remove leading/trailing underscores
-        cleaned = cleaned.strip('_')
-        
-        # Ensure the identifier does not start with a number
-        if not cleaned or cleaned[0].isdigit():
-            cleaned = f"var_{cleaned}" if cleaned else "unnamed_variable"
-            
-        return cleaned[:50]  # Enforce a reasonable length limit
+        return _clean_identifier_text(text)
 
-    def _extract_variables_from_text(self, text: str) -> List[str]:
+    def _extract_variables_from_text(self, text: str) -> Tuple[str, ...]:
         """
         A simple heuristic to extract potential variable names from node text.
         Looks for common assignment and I/O keywords.
         """
-        if not text:
-            return []
-        
-        # Regex to find words following assignment or I/O keywords.
-        # e.g., "x = 10", "set value", "input name", "print result"
-        patterns = [
-            r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=',  # Assignment: my_var = ...
-            r'(?:let|set|const|var)\s+([a-zA-Z_][a-zA-Z0-9_]*)', # Declaration: let my_var
-            r'(?:input|read|get|enter)\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # Input: input my_var
-            r'(?:print|display|show|output)\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # Output: print my_var
-        ]
-        
-        variables = []
-        for pattern in patterns:
-            # Find all non-overlapping matches
-            matches = re.findall(pattern, text.lower())
-            variables.extend(matches)
-        
-        # Clean and return unique variables
-        return sorted(list(set([self._clean_identifier(var) for var in variables if var])))
+        return _variables_in_text(text)
 
     def _wrap_with_color(self, lines: List[str], color: str, is_comment: bool = False) -> List[str]:
         """
@@ -73,39 +244,28 @@ class EducationalCodeGeneratorBase:
         # Use consistent, readable color for all comments
         if is_comment:
             # Process each comment line to add special styling for educational elements
-            wrapped_lines = []
-            for line in lines:
-                if line.strip():
-                    # Check for special educational elements
-                    if "Basic concept:" in line:
-                        # Use a nice blue color for basic concepts
-                        styled_line = self._style_educational_element(line, "#2980b9", "Basic concept:")  # Professional blue
-                        wrapped_lines.append(styled_line)
-                    elif "Learn more:" in line:
-                        # Use green color for learn more links
-                        styled_line = self._style_educational_element(line, "#27ae60", "Learn more:")  # Professional green
-                        wrapped_lines.append(styled_line)
-                    else:
-                        # Regular comment styling
-                        wrapped_lines.append(f'<span style="color: #666666;">{line}</span>')
-                else:
-                    wrapped_lines.append(line)  # Keep empty lines as-is
-            return wrapped_lines
+            return [self._style_comment_line(line) if line and not line.isspace() else line for line in lines]  # Keep empty lines as-is
         else:
             # For code lines, create a creative visual system
-            readable_color = self._ensure_readable_color(color)
-            # Add a subtle background color and left border for visual connection
-            bg_color = self._get_subtle_background(color)
-            style = f"color: {readable_color}; background-color: {bg_color}; border-left: 3px solid {readable_color}; padding-left: 8px; margin-left: -8px;"
-        
-            wrapped_lines = []
-            for line in lines:
-                if line.strip():  # Only wrap non-empty lines
-                    wrapped_lines.append(f'<span style="{style}">{line}</span>')
-                else:
-                    wrapped_lines.append(line)  # Keep empty lines as-is
-            
-            return wrapped_lines
+            # The opening tag only depends on the color, so it is built once per color and cached
+            span_open = _code_line_span_open(color)
+        
+            # Only wrap non-empty lines, keep empty lines as-is
+            return [span_open + line + _SPAN_CLOSE if line and not line.isspace() else line for line in lines]
+    
+    def _style_comment_line(self, line: str) -> str:
+        """
+        Styles a single non-empty comment line, highlighting educational elements.
+        """
+        # Check for special educational elements
+        if "Basic concept:" in line:
+            # Use a nice blue color for basic concepts
+            return self._style_educational_element(line, "#2980b9", "Basic concept:")  # Professional blue
+        elif "Learn more:" in line:
+            # Use green color for learn more links
+            return self._style_educational_element(line, "#27ae60", "Learn more:")  # Professional green
+        # Regular comment styling
+        return _COMMENT_SPAN_OPEN + line + _SPAN_CLOSE
     
     def _style_educational_element(self, line: str, element_color: str, element_text: str) -> str:
         """
@@ -113,118 +273,59 @@ class EducationalCodeGeneratorBase:
         Makes 'Learn more:' links clickable when they contain URLs.
         """
         # Split the line to style only the educational element part
-        if element_text in line:
-            parts = line.split(element_text, 1)
-            if len(parts) == 2:
-                prefix = parts[0]
-                suffix = parts[1]
-                
-                # Special handling for "Learn more:" to make links clickable
-                if element_text == "Learn more:" and suffix.strip():
-                    # Extract URL from the suffix
-                    url = self._extract_url_from_text(suffix)
-                    if url:
-                        # Create clickable link
-                        clickable_suffix = suffix.replace(url, f'<a href="{url}" target="_blank" style="color: {element_color}; text-decoration: underline;">{url}</a>')
-                        return (f'<span style="color: #666666;">{prefix}</span>'
-                               f'<span style="color: {element_color}; font-weight: bold;">{element_text}</span>'
-                               f'<span style="color: #666666;">{clickable_suffix}</span>')
-                
-                # Regular styling for non-link elements or Basic concept
-                return (f'<span style="color: #666666;">{prefix}</span>'
-                       f'<span style="color: {element_color}; font-weight: bold;">{element_text}</span>'
-                       f'<span style="color: #666666;">{suffix}</span>')
+        prefix, separator, suffix = line.partition(element_text)
+        if separator:
+            # Special handling for "Learn more:" to make links clickable
+            if element_text == "Learn more:" and suffix and not suffix.isspace():
+                # Find the URL in the suffix
+                url_match = self._find_url_in_text(suffix)
+                if url_match:
+                    # Create clickable link in place of the matched URL
+                    url = url_match.group(0)
+                    clickable_suffix = (suffix[:url_match.start()]
+                                        + f'<a href="{url}" target="_blank" style="color: {element_color}; text-decoration: underline;">{url}</a>'
+                                        + suffix[url_match.end():])
+                    return (f'<span style="color: #666666;">{prefix}</span>'
+                           f'<span style="color: {element_color}; font-weight: bold;">{element_text}</span>'
+                           f'<span style="color: #666666;">{clickable_suffix}</span>')
+            
+            # Regular styling for non-link elements or Basic concept
+            return (f'<span style="color: #666666;">{prefix}</span>'
+                   f'<span style="color: {element_color}; font-weight: bold;">{element_text}</span>'
+                   f'<span style="color: #666666;">{suffix}</span>')
         
         # Fallback to regular gray styling
         return f'<span style="color: #666666;">{line}</span>'
     
-    def _extract_url_from_text(self, text: str) -> str:
+    def _find_url_in_text(self, text: str) -> Optional[re.Match]:
         """
-        Extracts URL from text. Looks for http:// or https:// patterns.
+        Finds the first URL in text. Looks for http:// or https:// patterns.
+        Returns the match, so callers can use its span instead of searching for the URL again.
         """
-        import re
-        # Pattern to match URLs
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+[^\s<>"{}|\\^`\[\].,;:!?]'
-        match = re.search(url_pattern, text)
-        return match.group(0) if match else ""
+        # Every URL the pattern accepts contains 'http', so a substring check rules out most texts cheaply
+        if 'http' not in text:
+            return None
+        return _URL_RE.search(text)
 
     def _ensure_readable_color(self, color: str) -> str:
         """
         Ensures a color is dark enough to be readable on a white background.
         Converts light colors to darker, more readable versions.
         """
-        if not color or not color.startswith('#'):
-            return '#333333'  # Default dark gray
-        
-        try:
-            # Remove the # and convert to RGB
-            hex_color = color[1:]
-            if len(hex_color) == 3:
-                # Expand 3-digit hex to 6-digit
-                hex_color = ''.join([c*2 for c in hex_color])
-            
-            if len(hex_color) != 6:
-                return '#333333'
-            
-            # Convert to RGB values
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16) 
-            b = int(hex_color[4:6], 16)
-            
-            # Calculate luminance (perceived brightness)
-            luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
-            
-            # Check for problematic bright colors and handle them specially
-            # Bright green, bright yellow, bright cyan, bright magenta, etc.
-            if (r > 200 and g > 200) or (g > 200 and b > 200) or (r > 200 and b > 200):
-                # Very bright colors - darken significantly
-                r = max(0, min(120, int(r * 0.3)))
-                g = max(0, min(120, int(g * 0.3)))
-                b = max(0, min(120, int(b * 0.3)))
-                return f'#{r:02x}{g:02x}{b:02x}'
-            
-            # If too light (luminance > 0.5), darken it
-            elif luminance > 0.5:
-                # Darken by reducing RGB values
-                r = max(0, int(r * 0.5))
-                g = max(0, int(g * 0.5))
-                b = max(0, int(b * 0.5))
-                return f'#{r:02x}{g:02x}{b:02x}'
-            
-            # If reasonably dark, use as-is
-            return color
-            
-        except ValueError:
-            return '#333333'  # Fallback to dark gray
+        return _readable_color(color)
 
     def _get_subtle_background(self, color: str) -> str:
         """
         Creates a very subtle background color based on the node color.
         This provides visual connection without overwhelming the text.
         """
-        if not color or not color.startswith('#'):
-            return 'rgba(240, 240, 240, 0.1)'  # Very light gray
-        
-        try:
-            # Remove the # and convert to RGB
-            hex_color = color[1:]
-            if len(hex_color) == 3:
-                # Expand 3-digit hex to 6-digit
-                hex_color = ''.join([c*2 for c in hex_color])
-            
-            if len(hex_color) != 6:
-                return 'rgba(240, 240, 240, 0.1)'
-            
-            # Convert to RGB values
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16) 
-            b = int(hex_color[4:6], 16)
-            
-            # Create a very subtle background (5% opacity)
-            return f'rgba({r}, {g}, {b}, 0.05)'
-            
-        except ValueError:
-            return 'rgba(240, 240, 240, 0.1)'
+        return _subtle_background(color)
+
+    def _get_step_header_span_open(self, color: str) -> str:
+        """
+        Returns the opening span tag of a step header for the given node color, built once per color.
+        """
+        return _step_header_span_open(color)
 
     def _get_educational_comment(self, node: FlowchartNodeSchema) -> str:
         """
@@ -233,22 +334,10 @@ class EducationalCodeGeneratorBase:
         """
         node_type = node.type or 'process'
         
-        # Basic explanations with hyperlinks to educational resources
-        comments = {
-            'start': "🚀 Let's start here! This is like turning on your flowchart.\n    // Basic concept: Programs run from top to bottom, line by line.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming",
-            'end': "🏁 Program finished! This is where we stop.\n    // Basic concept: Every program needs a clear ending point.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming",
-            'process': "⚙️ Processing step: This does work or calculations.\n    // Basic concept: Variables are like boxes that hold information.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables",
-            'input': "📥 Getting information: This asks the user for data.\n    // Basic concept: Input is how we get information from users.\n    // Learn more: https://developer.mozilla.org/en-US/docs/Learn/JavaScript/First_steps/What_is_JavaScript#user_input",
-            'output': "📤 Showing results: This displays information to the user.\n    // Basic concept: Output is how we show results to users.\n    // Learn more: https://developer.mozilla.org/en-US/docs/Learn/JavaScript/First_steps/What_is_JavaScript#output",
-            'decision': "🤔 Making a choice: This asks a yes/no question.\n    // Basic concept: Decisions are like yes/no questions in real life.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/logic-if-statements/a/intro-to-if-statements"
-        }
-        
-        base_comment = comments.get(node_type, "📋 A general step in the process.\n    // Basic concept: Every step in a program does something specific.\n    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming")
+        rendered_comment = self._RENDERED_COMMENTS.get(node_type, self._RENDERED_DEFAULT_COMMENT)
         
         # Add the node's original text and a reference to its ID for traceability.
-        comment_lines = [base_comment]
+        id_line = f"    // (Corresponds to Flowchart Element ID: {node.id})"
         if node.value:
-            comment_lines.append(f"    // Flowchart Text: \"{node.value}\"")
-        comment_lines.append(f"    // (Corresponds to Flowchart Element ID: {node.id})")
-        
-        return "\n    // ".join(comment_lines) 
\ No newline at end of file
+            return f"{rendered_comment}    // Flowchart Text: \"{node.value}\"{_COMMENT_LINE_SEPARATOR}{id_line}"
+        return rendered_comment + id_line 
\ No newline at end of file
@@ -2,7 +2,63 @@ import networkx as nx
 from app.schemas.flowchart import FlowchartDataSchema, FlowchartNodeSchema
 from app.codegen.interfaces import CodeGenerator
 from app.codegen.base import EducationalCodeGeneratorBase
-from typing import List, Dict, Set
+from functools import lru_cache
+from typing import Any, List, Dict, Sequence, Set
+import re
+import string
+
+# Compiled once at import instead of going through re's pattern cache on every call
+_NON_IDENTIFIER_CHARS_RE = re.compile(r'[^a-zA-Z0-9_]')
+_REPEATED_UNDERSCORES_RE = re.compile(r'_{2,}')
+# Byte table mapping everything but [a-zA-Z0-9_] to '_', for cleaning ASCII identifiers without the regex engine
+_IDENTIFIER_CHARS = string.ascii_letters + string.digits + '_'
+_IDENTIFIER_TRANSLATION = bytes(byte if chr(byte) in _IDENTIFIER_CHARS else ord('_') for byte in range(256))
+# Look for patterns like "x = 5", "input number", "read value", etc.
+_ASSIGNMENT_PATTERN = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=')  # assignment patterns
+_KEYWORD_VARIABLE_PATTERNS = (
+    re.compile(r'(?:input|read|enter|get)\s+([a-zA-Z_][a-zA-Z0-9_]*)'),  # input patterns
+    re.compile(r'(?:print|output|display|show)\s+([a-zA-Z_][a-zA-Z0-9_]*)'),  # output patterns
+)
+
+# Educational comment per node type
+_COMMENTS = {
+    'start': "🚀 PROGRAM START: This is where our program begins execution",
+    'end': "🏁 PROGRAM END: This is where our program finishes execution",
+    'process': "⚙️ PROCESS: This step performs a calculation or operation",
+    'input': "📥 INPUT: This step gets data from the user",
+    'output': "📤 OUTPUT: This step displays information to the user",
+    'decision': "🤔 DECISION: This step makes a choice based on a condition",
+    'subroutine': "🔧 SUBROUTINE: This step calls or defines a reusable function"
+}
+_DEFAULT_COMMENT = "📋 STEP: This is a flowchart step"
+
+# Shared attribute dict for nodes missing from the graph; read-only
+_NO_NODE_ATTRS: Dict[str, Any] = {}
+
+@lru_cache(maxsize=1024)
+def _clean_identifier_text(text: str) -> str:
+    """
+    Converts flowchart text to valid programming identifiers.
+    Memoized, since the same few names recur across the nodes of a flowchart.
+    """
+    if not text:
+        return "unknownValue"
+    
+    # Remove special characters and replace with underscores. Surrounding whitespace becomes
+    # underscores that are stripped below, so the text is not stripped separately first.
+    if text.isascii():
+        cleaned = text.encode('ascii').translate(_IDENTIFIER_TRANSLATION).decode('ascii')
+    else:
+        cleaned = _NON_IDENTIFIER_CHARS_RE.sub('_', text)
+    if '__' in cleaned:
+        cleaned = _REPEATED_UNDERSCORES_RE.sub('_', cleaned)  # Replace multiple underscores with single
+    cleaned = cleaned.strip('_')  # Remove leading/trailing underscores
+    
+    # Ensure it starts with a letter
+    if not cleaned or cleaned[0].isdigit():
+        cleaned = f"var_{cleaned}" if cleaned else "unknownValue"
+        
+    return cleaned[:30]  # Limit length
 
 class EducationalCodeGenerator:
     """
@@ -14,20 +70,7 @@ class EducationalCodeGenerator:
         """
         Converts flowchart text to valid programming identifiers.
         """
-        if not text:
-            return "unknownValue"
-        
-        # Remove special characters and replace with underscores
-        import re
-        cleaned = re.sub(r'[^a-zA-Z0-9_]', '_', text.strip())
-        cleaned = re.sub(r'_{2,}', '_', cleaned)  # Replace multiple underscores with single
-        cleaned = cleaned.strip('_')  # Remove leading/trailing underscores
-        
-        # Ensure it starts with a letter
-        if not cleaned or cleaned[0].isdigit():
-            cleaned = f"var_{cleaned}" if cleaned else "unknownValue"
-            
-        return cleaned[:30]  # Limit length
+        return _clean_identifier_text(text)
     
     def _extract_variables_from_text(self, text: str) -> List[str]:
         """
@@ -36,17 +79,13 @@ class EducationalCodeGenerator:
         if not text:
             return []
         
-        import re
-        # Look for patterns like "x = 5", "input number", "read value", etc.
-        patterns = [
-            r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=',  # assignment patterns
-            r'(?:input|read|enter|get)\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # input patterns
-            r'(?:print|output|display|show)\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # output patterns
-        ]
-        
+        lowered = text.lower()
         variables = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text.lower())
+        # Most node texts contain no '=', so the assignment pattern can usually be skipped
+        if '=' in lowered:
+            variables.extend(_ASSIGNMENT_PATTERN.findall(lowered))
+        for pattern in _KEYWORD_VARIABLE_PATTERNS:
+            matches = pattern.findall(lowered)
             variables.extend(matches)
         
         return [self._clean_identifier(var) for var in variables if var]
@@ -56,17 +95,7 @@ class EducationalCodeGenerator:
         Generates educational comments explaining what each flowchart element does,
         with a hyperlink back to the node ID.
         """
-        comments = {
-            'start': "🚀 PROGRAM START: This is where our program begins execution",
-            'end': "🏁 PROGRAM END: This is where our program finishes execution",
-            'process': "⚙️ PROCESS: This step performs a calculation or operation",
-            'input': "📥 INPUT: This step gets data from the user",
-            'output': "📤 OUTPUT: This step displays information to the user",
-            'decision': "🤔 DECISION: This step makes a choice based on a condition",
-            'subroutine': "🔧 SUBROUTINE: This step calls or defines a reusable function"
-        }
-        
-        base_comment = comments.get(node.type, "📋 STEP: This is a flowchart step")
+        base_comment = _COMMENTS.get(node.type, _DEFAULT_COMMENT)
         
         # Append hyperlink to the node ID
         hyperlink = f"(Flowchart Node: {node.id})"
@@ -77,59 +106,121 @@ class EducationalCodeGenerator:
         
         return f"{base_comment}\n    // {hyperlink}"
 
+# Fixed blocks of the generated C++ program, built once at import rather than on every call
+_CPP_HEADER_LINES = (
+    "/*",
+    " * 🎓 EDUCATIONAL C++ CODE GENERATED FROM FLOWCHART",
+    " * ================================================",
+    " * This code was automatically generated from your flowchart.",
+    " * Each comment explains what the code does and how it relates",
+    " * to your flowchart elements.",
+    " *",
+    " * 📚 LEARNING NOTES:",
+    " * - #include statements bring in code libraries we need",
+    " * - Variables are like boxes that hold information",
+    " * - Programs run from top to bottom, line by line",
+    " * - Comments (like this) explain what code does",
+    " * Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
+    " */",
+    "",
+    "// 📚 INCLUDE LIBRARIES: These give us access to useful functions",
+    "#include <iostream>  // For input/output (cin, cout)",
+    "#include <string>    // For working with text",
+    "#include <vector>    // For lists of data",
+    "#include <cstdlib>   // For system functions like exit()",
+    "",
+)
+_CPP_SUBROUTINES_INTRO_LINES = (
+    "// 🔧 SUBROUTINE DECLARATIONS: These are reusable functions",
+    "// Basic concept: Functions let us organize code into named blocks",
+    "// Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
+    "",
+)
+_CPP_MAIN_PROLOGUE_LINES = (
+    "// 🚀 MAIN FUNCTION: This is where every C++ program starts",
+    "int main() {",
+    "    // The main function contains all the logic from your flowchart",
+    "    std::cout << \"=== FLOWCHART PROGRAM STARTING ===\" << std::endl;",
+    "    std::cout << \"This program follows your flowchart step by step!\" << std::endl;",
+    "    std::cout << std::endl;",
+    "",
+)
+_CPP_VARIABLES_INTRO_LINES = (
+    "    // 📦 VARIABLES: These are like boxes that store information",
+    "    // Basic concept: Variables hold data we can use later",
+    "    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables",
+)
+_CPP_MAIN_EPILOGUE_LINES = (
+    "",
+    "    // 🏁 If we get here, the program completed normally",
+    "    std::cout << std::endl << \"=== PROGRAM COMPLETED ===\" << std::endl;",
+    "    return 0;  // Tell the system: \"Program finished successfully\"",
+    "}",
+    "",
+)
+# Node code that does not depend on the node's text
+_CPP_START_LINES = (
+    "    std::cout << \"🚀 Starting the program...\" << std::endl;",
+    "    // Basic concept: Every program needs a starting point",
+    "",
+)
+_CPP_DECISION_TWO_PATHS_LINES = (
+    "    if (decision_result) {  // If condition is TRUE",
+    "        std::cout << \"→ Condition is TRUE, taking YES path\" << std::endl;",
+    "        // Continue with YES path logic here",
+    "    } else {  // If condition is FALSE",
+    "        std::cout << \"→ Condition is FALSE, taking NO path\" << std::endl;",
+    "        // Continue with NO path logic here",
+    "    }",
+    "",
+)
+_CPP_DECISION_ONE_PATH_LINES = (
+    "    if (decision_result) {  // If condition is TRUE",
+    "        std::cout << \"→ Condition is TRUE, continuing\" << std::endl;",
+    "        // Continue with next step",
+    "    } else {",
+    "        std::cout << \"→ Condition is FALSE, program ends\" << std::endl;",
+    "        return 0;",
+    "    }",
+    "",
+)
+_CPP_DECISION_NO_PATHS_LINES = (
+    "    std::cout << \"⚠️ Warning: Decision has no paths to follow!\" << std::endl;",
+    "",
+)
+
 class CppCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
     '''
     Generates educational C++ code from a flowchart with extensive comments and explanations.
     '''
+    # Generators hold no per-instance state
+    __slots__ = ()
+
     def generate_code(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, idiomatic: bool = False) -> str:
-        if idiomatic:
-            return self._generate_educational_cpp(flowchart_data, graph)
-        else:
-            return self._generate_educational_cpp(flowchart_data, graph)
+        # Both styles currently produce the educational code
+        return self._generate_educational_cpp(flowchart_data, graph)
 
     def _generate_educational_cpp(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> str:
         code_lines: List[str] = []
         
-        # Header with explanation
-        code_lines.extend([
-            "/*",
-            " * 🎓 EDUCATIONAL C++ CODE GENERATED FROM FLOWCHART",
-            " * ================================================",
-            " * This code was automatically generated from your flowchart.",
-            " * Each comment explains what the code does and how it relates",
-            " * to your flowchart elements.",
-            " *",
-            " * 📚 LEARNING NOTES:",
-            " * - #include statements bring in code libraries we need",
-            " * - Variables are like boxes that hold information",
-            " * - Programs run from top to bottom, line by line",
-            " * - Comments (like this) explain what code does",
-            " * Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
-            " */",
-            ""
-        ])
+        # Header and include statements with explanations
+        code_lines.extend(_CPP_HEADER_LINES)
 
-        # Include statements with explanations
-        code_lines.extend([
-            "// 📚 INCLUDE LIBRARIES: These give us access to useful functions",
-            "#include <iostream>  // For input/output (cin, cout)",
-            "#include <string>    // For working with text",
-            "#include <vector>    // For lists of data", 
-            "#include <cstdlib>   // For system functions like exit()",
-            ""
-        ])
+        # Graph attributes of every node, read into a plain dict once instead of through graph.nodes per lookup
+        node_attr_map: Dict[str, Dict[str, Any]] = dict(graph.nodes(data=True))
 
-        # Collect variables from flowchart
+        # Collect variables, subroutines and the node lookup in a single pass over the flowchart
         all_variables = set()
         subroutines = {}  # Dictionary to store subroutine definitions
+        node_map = {}  # Mapping from node ID to node object
         
         for node in flowchart_data.nodes:
+            node_map[node.id] = node
             if node.value:
-                vars_in_node = self._extract_variables_from_text(node.value)
-                all_variables.update(vars_in_node)
+                all_variables.update(self._extract_variables_from_text(node.value))
             
             # Check if this is a subroutine node
-            node_attrs = graph.nodes.get(node.id, {})
+            node_attrs = node_attr_map.get(node.id, _NO_NODE_ATTRS)
             if node_attrs.get('type') == 'subroutine':
                 func_name = node_attrs.get('subroutine_name')
                 params = node_attrs.get('subroutine_params', [])
@@ -144,12 +235,7 @@ class CppCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
 
         # Generate subroutine function declarations
         if subroutines:
-            code_lines.extend([
-                "// 🔧 SUBROUTINE DECLARATIONS: These are reusable functions",
-                "// Basic concept: Functions let us organize code into named blocks",
-                "// Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
-                ""
-            ])
+            code_lines.extend(_CPP_SUBROUTINES_INTRO_LINES)
             
             for func_name, sub_info in subroutines.items():
                 params_str = ', '.join([f'std::string {p}' for p in sub_info['params']]) if sub_info['params'] else ''
@@ -164,309 +250,325 @@ class CppCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
                 ])
         
         # Main function with all logic inline
-        code_lines.extend([
-            "// 🚀 MAIN FUNCTION: This is where every C++ program starts",
-            "int main() {",
-            "    // The main function contains all the logic from your flowchart",
-            "    std::cout << \"=== FLOWCHART PROGRAM STARTING ===\" << std::endl;",
-            "    std::cout << \"This program follows your flowchart step by step!\" << std::endl;",
-            "    std::cout << std::endl;",
-            ""
-        ])
+        code_lines.extend(_CPP_MAIN_PROLOGUE_LINES)
 
         # Declare variables at the top of main
         if all_variables:
-            code_lines.extend([
-                "    // 📦 VARIABLES: These are like boxes that store information",
-                "    // Basic concept: Variables hold data we can use later",
-                "    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables"
-            ])
-            for var in sorted(all_variables):
-                code_lines.append(f"    std::string {var};  // Will store: {var}")
+            code_lines.extend(_CPP_VARIABLES_INTRO_LINES)
+            # One line per variable, joined into a single block since the declarations are never styled individually
+            code_lines.append('\n'.join([f"    std::string {var};  // Will store: {var}" for var in sorted(all_variables)]))
             code_lines.append("")
 
-        # Use topological sort to get linear order of nodes
+        # Use topological sort to get linear order of nodes. Only the sort itself is guarded, and only
+        # against the cycle error it raises, so failures while generating code are not masked by the fallback.
         try:
             # Get topological order of nodes
             topo_order = list(nx.topological_sort(graph))
-            
-            # Create a mapping from node ID to node object
-            node_map = {node.id: node for node in flowchart_data.nodes}
-            
+            cycle_error = None
+        except nx.NetworkXUnfeasible as e:
+            cycle_error = e
+
+        if cycle_error is None:
             # Generate linear code for each node in topological order
             for i, node_id in enumerate(topo_order):
                 if node_id in node_map:
                     node = node_map[node_id]
-                    self._generate_inline_cpp_logic(node, graph, code_lines, i, len(topo_order))
-                    
-        except Exception as e:
-            # If graph has cycles or other issues, fall back to original node order
+                    self._generate_inline_cpp_logic(node, graph, code_lines, i, len(topo_order), node_attr_map)
+        else:
+            # If graph has cycles, fall back to original node order
             code_lines.append(f"    // ⚠️ Note: Flowchart has cycles or structural issues, using original order")
-            code_lines.append(f"    // Debug: {str(e)}")
+            code_lines.append(f"    // Debug: {str(cycle_error)}")
             for i, node in enumerate(flowchart_data.nodes):
-                self._generate_inline_cpp_logic(node, graph, code_lines, i, len(flowchart_data.nodes))
+                self._generate_inline_cpp_logic(node, graph, code_lines, i, len(flowchart_data.nodes), node_attr_map)
 
-        code_lines.extend([
-            "",
-            "    // 🏁 If we get here, the program completed normally",
-            "    std::cout << std::endl << \"=== PROGRAM COMPLETED ===\" << std::endl;",
-            "    return 0;  // Tell the system: \"Program finished successfully\"",
-            "}",
-            ""
-        ])
+        code_lines.extend(_CPP_MAIN_EPILOGUE_LINES)
 
         return '\n'.join(code_lines)
 
     def _generate_inline_cpp_logic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, 
-                                  code_lines: List[str], node_index: int, total_nodes: int):
+                                  code_lines: List[str], node_index: int, total_nodes: int,
+                                  node_attr_map: Dict[str, Dict[str, Any]]):
         """
         Generates inline logic for a single flowchart node within the main function.
         """
-        node_color = getattr(node, 'color', '#f0f0f0')  # Default to light gray
+        node_color = node.color  # Uncolored nodes (None) get the color helpers' default styling
+        node_type = node.type  # Read once for the step header and the emitter lookup
         
         # Add a creative step header with node color
-        readable_color = self._ensure_readable_color(node_color)
-        bg_color = self._get_subtle_background(node_color)
-        step_header_style = f"color: {readable_color}; background-color: {bg_color}; border: 2px solid {readable_color}; padding: 4px 8px; font-weight: bold; border-radius: 4px;"
-        step_header = f'<span style="{step_header_style}">🔹 STEP {node_index + 1}/{total_nodes} - {node.type.upper() if node.type else "STEP"}: {node.value or "Unknown"}</span>'
+        step_header_open = self._get_step_header_span_open(node_color)
+        step_header = f'{step_header_open}🔹 STEP {node_index + 1}/{total_nodes} - {node_type.upper() if node_type else "STEP"}: {node.value or "Unknown"}</span>'
         code_lines.append(step_header)
         code_lines.append("")
         
         # Add educational comment for this step (in gray)
         comment = self._get_educational_comment(node)
-        comment_lines = []
-        for line in comment.split('\n'):
-            comment_lines.append(f"    // {line.strip()}")
+        comment_lines = [f"    // {line.strip()}" for line in comment.split('\n')]
         comment_lines.append("")
         
         # Wrap comment lines with consistent gray color
         colored_comments = self._wrap_with_color(comment_lines, node_color, is_comment=True)
         code_lines.extend(colored_comments)
 
-        node_type = node.type or 'process'
+        emit = self._NODE_EMITTERS.get(node_type or 'process', CppCodeGenerator._emit_generic)
+        node_code = emit(self, node, graph, node_attr_map.get(node.id, _NO_NODE_ATTRS))
+        # All code lines of the node share its color, so they are wrapped in a single pass
+        code_lines.extend(self._wrap_with_color(node_code, node_color))
+
+    def _emit_start(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program start."""
+        return _CPP_START_LINES
 
-        if node_type == 'start':
+    def _emit_end(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program end."""
+        return [
+            "    std::cout << \"🏁 Program is ending...\" << std::endl;",
+            f"    std::cout << \"Final message: {node.value or 'Program complete'}\" << std::endl;",
+            "    // Basic concept: Programs should end cleanly",
+            "    return 0;  // Exit the main function",
+            ""
+        ]
+
+    def _emit_process(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a processing step, with a TODO for each variable it mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"    std::cout << \"⚙️ Processing: {value or 'Calculation step'}\" << std::endl;",
+            "    // Basic concept: This is where we do calculations or work",
+        ]
+        if variables:
+            node_code.append(f"    // TODO: Replace this with actual processing logic for: {', '.join(variables)}")
+            for var in variables:
+                node_code.append(f"    // Example: {var} = \"someValue\";  // Set {var} to a value")
+        else:
+            node_code.append("    // TODO: Add your processing logic here")
+            node_code.append("    // This represents a calculation or operation from your flowchart")
+        node_code.append("")
+        return node_code
+
+    def _emit_input(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits reading user input into the first variable the node mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        if variables:
+            var_name = variables[0]
             node_code = [
-                "    std::cout << \"🚀 Starting the program...\" << std::endl;",
-                "    // Basic concept: Every program needs a starting point",
-                ""
+                f"    std::cout << \"📥 Input needed: {value}\" << std::endl;",
+                f"    std::cout << \"Please enter {var_name}: \";",
+                f"    std::getline(std::cin, {var_name});  // Read user input into {var_name}",
+                f"    std::cout << \"You entered: \" << {var_name} << std::endl;",
+                "    // Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'end':
+        else:
             node_code = [
-                "    std::cout << \"🏁 Program is ending...\" << std::endl;",
-                f"    std::cout << \"Final message: {node.value or 'Program complete'}\" << std::endl;",
-                "    // Basic concept: Programs should end cleanly",
-                "    return 0;  // Exit the main function",
-                ""
+                f"    std::cout << \"📥 {value or 'Please enter data'}\" << std::endl;",
+                "    std::string userInput;  // Variable to store what user types",
+                "    std::cout << \"Enter value: \";",
+                "    std::getline(std::cin, userInput);  // Read user input",
+                "    std::cout << \"You entered: \" << userInput << std::endl;",
+                "    // Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'process':
-            variables = self._extract_variables_from_text(node.value or "")
+        node_code.append("")
+        return node_code
+
+    def _emit_output(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits displaying a result."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"    std::cout << \"📤 Output: {value or 'Displaying result'}\" << std::endl;",
+            "    // Basic concept: Output shows results to users",
+        ]
+        if variables:
+            for var in variables:
+                node_code.append(f"    // std::cout << {var} << std::endl;  // Display {var}")
+        node_code.append("")
+        return node_code
+
+    def _emit_decision(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the condition and an if/else matching the number of outgoing paths."""
+        value = node.value
+        # Only the number of paths matters, so the successors are counted rather than listed
+        successor_count = graph.out_degree(node.id)
+        node_code = [
+            f"    std::cout << \"🤔 Decision point: {value or 'Making a choice'}\" << std::endl;",
+            "    // Basic concept: Decisions are like yes/no questions",
+            "    // TODO: Replace 'true' with your actual condition",
+            f"    bool decision_result = true;  // Condition: {value or 'Some condition'}",
+            ""
+        ]
+
+        if successor_count >= 2:
+            node_code.extend(_CPP_DECISION_TWO_PATHS_LINES)
+        elif successor_count == 1:
+            node_code.extend(_CPP_DECISION_ONE_PATH_LINES)
+        else:
+            node_code.extend(_CPP_DECISION_NO_PATHS_LINES)
+        return node_code
+
+    def _emit_subroutine(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a call to the subroutine the node refers to."""
+        # Subroutine information comes from the node's graph attributes
+        func_name = node_attrs.get('subroutine_name')
+        params = node_attrs.get('subroutine_params', [])
+
+        if func_name:
             node_code = [
-                f"    std::cout << \"⚙️ Processing: {node.value or 'Calculation step'}\" << std::endl;",
-                "    // Basic concept: This is where we do calculations or work",
+                f"    std::cout << \"🔧 Calling subroutine: {func_name}\" << std::endl;",
+                "    // Basic concept: Subroutines are reusable blocks of code",
             ]
-            if variables:
-                node_code.append(f"    // TODO: Replace this with actual processing logic for: {', '.join(variables)}")
-                for var in variables:
-                    node_code.append(f"    // Example: {var} = \"someValue\";  // Set {var} to a value")
+
+            if params:
+                node_code.extend([
+                    f"    // TODO: Pass actual arguments for parameters: {', '.join(params)}",
+                    f"    // {func_name}()  // Call with appropriate arguments"
+                ])
             else:
-                node_code.append("    // TODO: Add your processing logic here")
-                node_code.append("    // This represents a calculation or operation from your flowchart")
+                node_code.append(f"    // {func_name}()  // Call the subroutine")
             node_code.append("")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'input':
-            variables = self._extract_variables_from_text(node.value or "")
-            if variables:
-                var_name = variables[0]
-                node_code = [
-                    f"    std::cout << \"📥 Input needed: {node.value}\" << std::endl;",
-                    f"    std::cout << \"Please enter {var_name}: \";",
-                    f"    std::getline(std::cin, {var_name});  // Read user input into {var_name}",
-                    f"    std::cout << \"You entered: \" << {var_name} << std::endl;",
-                    "    // Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    f"    std::cout << \"📥 {node.value or 'Please enter data'}\" << std::endl;",
-                    "    std::string userInput;  // Variable to store what user types",
-                    "    std::cout << \"Enter value: \";",
-                    "    std::getline(std::cin, userInput);  // Read user input",
-                    "    std::cout << \"You entered: \" << userInput << std::endl;",
-                    "    // Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'output':
-            variables = self._extract_variables_from_text(node.value or "")
-            node_code = [
-                f"    std::cout << \"📤 Output: {node.value or 'Displaying result'}\" << std::endl;",
-                "    // Basic concept: Output shows results to users",
-            ]
-            if variables:
-                for var in variables:
-                    node_code.append(f"    // std::cout << {var} << std::endl;  // Display {var}")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'decision':
-            successors = list(graph.successors(node.id))
-            node_code = [
-                f"    std::cout << \"🤔 Decision point: {node.value or 'Making a choice'}\" << std::endl;",
-                "    // Basic concept: Decisions are like yes/no questions",
-                "    // TODO: Replace 'true' with your actual condition",
-                f"    bool decision_result = true;  // Condition: {node.value or 'Some condition'}",
-                ""
-            ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-            if len(successors) >= 2:
-                node_code = [
-                    "    if (decision_result) {  // If condition is TRUE",
-                    "        std::cout << \"→ Condition is TRUE, taking YES path\" << std::endl;",
-                    "        // Continue with YES path logic here",
-                    "    } else {  // If condition is FALSE", 
-                    "        std::cout << \"→ Condition is FALSE, taking NO path\" << std::endl;",
-                    "        // Continue with NO path logic here",
-                    "    }",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            elif len(successors) == 1:
-                node_code = [
-                    "    if (decision_result) {  // If condition is TRUE",
-                    "        std::cout << \"→ Condition is TRUE, continuing\" << std::endl;",
-                    "        // Continue with next step",
-                    "    } else {",
-                    "        std::cout << \"→ Condition is FALSE, program ends\" << std::endl;",
-                    "        return 0;",
-                    "    }",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    "    std::cout << \"⚠️ Warning: Decision has no paths to follow!\" << std::endl;",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-        elif node_type == 'subroutine':
-            # Get subroutine information from graph attributes
-            node_attrs = graph.nodes.get(node.id, {})
-            func_name = node_attrs.get('subroutine_name')
-            params = node_attrs.get('subroutine_params', [])
-            
-            if func_name:
-                node_code = [
-                    f"    std::cout << \"🔧 Calling subroutine: {func_name}\" << std::endl;",
-                    "    // Basic concept: Subroutines are reusable blocks of code",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-                
-                if params:
-                    node_code = [
-                        f"    // TODO: Pass actual arguments for parameters: {', '.join(params)}",
-                        f"    // {func_name}()  // Call with appropriate arguments"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                else:
-                    node_code = [
-                        f"    // {func_name}()  // Call the subroutine"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                code_lines.append("")
-            else:
-                node_code = [
-                    f"    std::cout << \"🔧 Subroutine call: {node.value or 'Unknown subroutine'}\" << std::endl;",
-                    "    // TODO: Replace with actual subroutine call",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
         else:
             node_code = [
-                f"    std::cout << \"📋 Generic step: {node.value or 'Unknown step'}\" << std::endl;",
-                "    // This is a general flowchart element",
+                f"    std::cout << \"🔧 Subroutine call: {node.value or 'Unknown subroutine'}\" << std::endl;",
+                "    // TODO: Replace with actual subroutine call",
                 ""
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
+        return node_code
 
-    def _generate_direct_cpp(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> str:
-        # Keep the old version for backward compatibility, but redirect to educational
-        return self._generate_educational_cpp(flowchart_data, graph)
+    def _emit_generic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a general step for node types without a dedicated emitter."""
+        return [
+            f"    std::cout << \"📋 Generic step: {node.value or 'Unknown step'}\" << std::endl;",
+            "    // This is a general flowchart element",
+            ""
+        ]
+
+    # Node type -> emitter returning the node's uncolored code lines; node types without an entry use _emit_generic
+    _NODE_EMITTERS = {
+        'start': _emit_start,
+        'end': _emit_end,
+        'process': _emit_process,
+        'input': _emit_input,
+        'output': _emit_output,
+        'decision': _emit_decision,
+        'subroutine': _emit_subroutine,
+    }
+
+# Fixed blocks of the generated Java program, built once at import rather than on every call
+_JAVA_HEADER_LINES = (
+    "/*",
+    " * 🎓 EDUCATIONAL JAVA CODE GENERATED FROM FLOWCHART",
+    " * ================================================",
+    " * This code was automatically generated from your flowchart.",
+    " * Each comment explains what the code does and how it relates",
+    " * to your flowchart elements.",
+    " *",
+    " * 📚 LEARNING NOTES:",
+    " * - import statements bring in Java libraries we need",
+    " * - Variables are like boxes that hold information",
+    " * - Programs run from top to bottom, line by line",
+    " * - Comments (like this) explain what code does",
+    " * - System.out.println() displays text to the user",
+    " * Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
+    " */",
+    "",
+    "// 📚 IMPORT LIBRARIES: These give us access to useful Java classes",
+    "import java.util.Scanner;  // For reading user input",
+    "",
+)
+_JAVA_SUBROUTINES_INTRO_LINES = (
+    "    // 🔧 SUBROUTINE METHODS: These are reusable pieces of code",
+    "    // Basic concept: Methods let us organize code into named blocks",
+    "    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
+    "",
+)
+_JAVA_MAIN_PROLOGUE_LINES = (
+    "    // 🚀 MAIN METHOD: This is where every Java program starts",
+    "    public static void main(String[] args) {",
+    "        // The main method contains all the logic from your flowchart",
+    "        System.out.println(\"=== FLOWCHART PROGRAM STARTING ===\");",
+    "        System.out.println(\"This program follows your flowchart step by step!\");",
+    "        System.out.println();",
+    "",
+)
+_JAVA_VARIABLES_INTRO_LINES = (
+    "        // 📦 VARIABLES: These are like boxes that store information",
+    "        // Basic concept: Variables hold data we can use later",
+    "        // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables",
+)
+_JAVA_MAIN_EPILOGUE_LINES = (
+    "",
+    "        // 🏁 If we get here, the program completed normally",
+    "        System.out.println();",
+    "        System.out.println(\"=== PROGRAM COMPLETED ===\");",
+    "        scanner.close();  // Clean up the scanner",
+    "    }",
+    "}",  # Close the class
+    "",
+)
+# Node code that does not depend on the node's text
+_JAVA_START_LINES = (
+    "        System.out.println(\"🚀 Starting the program...\");",
+    "        // Basic concept: Every program needs a starting point",
+    "",
+)
+_JAVA_DECISION_TWO_PATHS_LINES = (
+    "        if (decision_result) {  // If condition is TRUE",
+    "            System.out.println(\"→ Condition is TRUE, taking YES path\");",
+    "            // Continue with YES path logic here",
+    "        } else {  // If condition is FALSE",
+    "            System.out.println(\"→ Condition is FALSE, taking NO path\");",
+    "            // Continue with NO path logic here",
+    "        }",
+    "",
+)
+_JAVA_DECISION_ONE_PATH_LINES = (
+    "        if (decision_result) {  // If condition is TRUE",
+    "            System.out.println(\"→ Condition is TRUE, continuing\");",
+    "            // Continue with next step",
+    "        } else {",
+    "            System.out.println(\"→ Condition is FALSE, program ends\");",
+    "            return;",
+    "        }",
+    "",
+)
+_JAVA_DECISION_NO_PATHS_LINES = (
+    "        System.out.println(\"⚠️ Warning: Decision has no paths to follow!\");",
+    "",
+)
 
 class JavaCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
     '''
     Generates educational Java code from a flowchart with extensive comments and explanations.
     '''
+    # Generators hold no per-instance state
+    __slots__ = ()
+
     def generate_code(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, idiomatic: bool = False) -> str:
-        if idiomatic:
-            return self._generate_educational_java(flowchart_data, graph)
-        else:
-            return self._generate_educational_java(flowchart_data, graph)
+        # Both styles currently produce the educational code
+        return self._generate_educational_java(flowchart_data, graph)
 
     def _generate_educational_java(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> str:
         code_lines: List[str] = []
         class_name = "FlowchartProgram"
         
-        # Header with explanation
-        code_lines.extend([
-            "/*",
-            " * 🎓 EDUCATIONAL JAVA CODE GENERATED FROM FLOWCHART",
-            " * ================================================",
-            " * This code was automatically generated from your flowchart.",
-            " * Each comment explains what the code does and how it relates",
-            " * to your flowchart elements.",
-            " *",
-            " * 📚 LEARNING NOTES:",
-            " * - import statements bring in Java libraries we need",
-            " * - Variables are like boxes that hold information",
-            " * - Programs run from top to bottom, line by line",
-            " * - Comments (like this) explain what code does",
-            " * - System.out.println() displays text to the user",
-            " * Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
-            " */",
-            ""
-        ])
+        # Header and import statements with explanations
+        code_lines.extend(_JAVA_HEADER_LINES)
 
-        # Import statements with explanations
-        code_lines.extend([
-            "// 📚 IMPORT LIBRARIES: These give us access to useful Java classes",
-            "import java.util.Scanner;  // For reading user input",
-            ""
-        ])
+        # Graph attributes of every node, read into a plain dict once instead of through graph.nodes per lookup
+        node_attr_map: Dict[str, Dict[str, Any]] = dict(graph.nodes(data=True))
 
-        # Collect variables from flowchart
+        # Collect variables, subroutines and the node lookup in a single pass over the flowchart
         all_variables = set()
         subroutines = {}  # Dictionary to store subroutine definitions
+        node_map = {}  # Mapping from node ID to node object
         
         for node in flowchart_data.nodes:
+            node_map[node.id] = node
             if node.value:
-                vars_in_node = self._extract_variables_from_text(node.value)
-                all_variables.update(vars_in_node)
+                all_variables.update(self._extract_variables_from_text(node.value))
             
             # Check if this is a subroutine node
-            node_attrs = graph.nodes.get(node.id, {})
+            node_attrs = node_attr_map.get(node.id, _NO_NODE_ATTRS)
             if node_attrs.get('type') == 'subroutine':
                 func_name = node_attrs.get('subroutine_name')
                 params = node_attrs.get('subroutine_params', [])
@@ -490,12 +592,7 @@ class JavaCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
 
         # Generate subroutine methods
         if subroutines:
-            code_lines.extend([
-                "    // 🔧 SUBROUTINE METHODS: These are reusable pieces of code",
-                "    // Basic concept: Methods let us organize code into named blocks",
-                "    // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
-                ""
-            ])
+            code_lines.extend(_JAVA_SUBROUTINES_INTRO_LINES)
             
             for func_name, sub_info in subroutines.items():
                 params_str = ', '.join([f'String {p}' for p in sub_info['params']]) if sub_info['params'] else ''
@@ -510,297 +607,316 @@ class JavaCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
                 ])
 
         # Main method with all logic inline
-        code_lines.extend([
-            "    // 🚀 MAIN METHOD: This is where every Java program starts",
-            "    public static void main(String[] args) {",
-            "        // The main method contains all the logic from your flowchart",
-            "        System.out.println(\"=== FLOWCHART PROGRAM STARTING ===\");",
-            "        System.out.println(\"This program follows your flowchart step by step!\");",
-            "        System.out.println();",
-            ""
-        ])
+        code_lines.extend(_JAVA_MAIN_PROLOGUE_LINES)
 
         # Declare variables at the top of main
         if all_variables:
-            code_lines.extend([
-                "        // 📦 VARIABLES: These are like boxes that store information",
-                "        // Basic concept: Variables hold data we can use later",
-                "        // Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables"
-            ])
-            for var in sorted(all_variables):
-                code_lines.append(f"        String {var} = null;  // Will store: {var}")
+            code_lines.extend(_JAVA_VARIABLES_INTRO_LINES)
+            # One line per variable, joined into a single block since the declarations are never styled individually
+            code_lines.append('\n'.join([f"        String {var} = null;  // Will store: {var}" for var in sorted(all_variables)]))
             code_lines.append("")
 
-        # Use topological sort to get linear order of nodes
+        # Use topological sort to get linear order of nodes. Only the sort itself is guarded, and only
+        # against the cycle error it raises, so failures while generating code are not masked by the fallback.
         try:
             # Get topological order of nodes
             topo_order = list(nx.topological_sort(graph))
-            
-            # Create a mapping from node ID to node object
-            node_map = {node.id: node for node in flowchart_data.nodes}
-            
+            cycle_error = None
+        except nx.NetworkXUnfeasible as e:
+            cycle_error = e
+
+        if cycle_error is None:
             # Generate linear code for each node in topological order
             for i, node_id in enumerate(topo_order):
                 if node_id in node_map:
                     node = node_map[node_id]
-                    self._generate_inline_java_logic(node, graph, code_lines, i, len(topo_order))
-                    
-        except Exception as e:
-            # If graph has cycles or other issues, fall back to original node order
+                    self._generate_inline_java_logic(node, graph, code_lines, i, len(topo_order), node_attr_map)
+        else:
+            # If graph has cycles, fall back to original node order
             code_lines.append(f"        // ⚠️ Note: Flowchart has cycles or structural issues, using original order")
-            code_lines.append(f"        // Debug: {str(e)}")
+            code_lines.append(f"        // Debug: {str(cycle_error)}")
             for i, node in enumerate(flowchart_data.nodes):
-                self._generate_inline_java_logic(node, graph, code_lines, i, len(flowchart_data.nodes))
+                self._generate_inline_java_logic(node, graph, code_lines, i, len(flowchart_data.nodes), node_attr_map)
 
-        code_lines.extend([
-            "",
-            "        // 🏁 If we get here, the program completed normally",
-            "        System.out.println();",
-            "        System.out.println(\"=== PROGRAM COMPLETED ===\");",
-            "        scanner.close();  // Clean up the scanner",
-            "    }",
-            "}",  # Close the class
-            ""
-        ])
+        code_lines.extend(_JAVA_MAIN_EPILOGUE_LINES)
 
         return '\n'.join(code_lines)
 
     def _generate_inline_java_logic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, 
-                                   code_lines: List[str], node_index: int, total_nodes: int):
+                                   code_lines: List[str], node_index: int, total_nodes: int,
+                                   node_attr_map: Dict[str, Dict[str, Any]]):
         """
         Generates inline logic for a single flowchart node within the main method.
         """
-        node_color = getattr(node, 'color', '#f0f0f0')  # Default to light gray
+        node_color = node.color  # Uncolored nodes (None) get the color helpers' default styling
+        node_type = node.type  # Read once for the step header and the emitter lookup
         
         # Add a creative step header with node color
-        readable_color = self._ensure_readable_color(node_color)
-        bg_color = self._get_subtle_background(node_color)
-        step_header_style = f"color: {readable_color}; background-color: {bg_color}; border: 2px solid {readable_color}; padding: 4px 8px; font-weight: bold; border-radius: 4px;"
-        step_header = f'<span style="{step_header_style}">🔹 STEP {node_index + 1}/{total_nodes} - {node.type.upper() if node.type else "STEP"}: {node.value or "Unknown"}</span>'
+        step_header_open = self._get_step_header_span_open(node_color)
+        step_header = f'{step_header_open}🔹 STEP {node_index + 1}/{total_nodes} - {node_type.upper() if node_type else "STEP"}: {node.value or "Unknown"}</span>'
         code_lines.append(step_header)
         code_lines.append("")
         
         # Add educational comment for this step (in gray)
         comment = self._get_educational_comment(node)
-        comment_lines = []
-        for line in comment.split('\n'):
-            comment_lines.append(f"        // {line.strip()}")
+        comment_lines = [f"        // {line.strip()}" for line in comment.split('\n')]
         comment_lines.append("")
         
         # Wrap comment lines with consistent gray color
         colored_comments = self._wrap_with_color(comment_lines, node_color, is_comment=True)
         code_lines.extend(colored_comments)
 
-        node_type = node.type or 'process'
+        emit = self._NODE_EMITTERS.get(node_type or 'process', JavaCodeGenerator._emit_generic)
+        node_code = emit(self, node, graph, node_attr_map.get(node.id, _NO_NODE_ATTRS))
+        # All code lines of the node share its color, so they are wrapped in a single pass
+        code_lines.extend(self._wrap_with_color(node_code, node_color))
+
+    def _emit_start(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program start."""
+        return _JAVA_START_LINES
+
+    def _emit_end(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program end."""
+        return [
+            "        System.out.println(\"🏁 Program is ending...\");",
+            f"        System.out.println(\"Final message: {node.value or 'Program complete'}\");",
+            "        // Basic concept: Programs should end cleanly",
+            "        return;  // Exit the main method",
+            ""
+        ]
+
+    def _emit_process(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a processing step, with a TODO for each variable it mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"        System.out.println(\"⚙️ Processing: {value or 'Calculation step'}\");",
+            "        // Basic concept: This is where we do calculations or work",
+        ]
 
-        if node_type == 'start':
+        if variables:
+            node_code.append(f"        // TODO: Replace this with actual processing logic for: {', '.join(variables)}")
+            for var in variables:
+                node_code.append(f"        // Example: {var} = \"someValue\";  // Set {var} to a value")
+        else:
+            node_code.append("        // TODO: Add your processing logic here")
+            node_code.append("        // This represents a calculation or operation from your flowchart")
+        node_code.append("")
+        return node_code
+
+    def _emit_input(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits reading user input into the first variable the node mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        if variables:
+            var_name = variables[0]
             node_code = [
-                "        System.out.println(\"🚀 Starting the program...\");",
-                "        // Basic concept: Every program needs a starting point",
-                ""
+                f"        System.out.println(\"📥 Input needed: {value}\");",
+                f"        System.out.print(\"Please enter {var_name}: \");",
+                f"        {var_name} = scanner.nextLine();  // Read user input into {var_name}",
+                f"        System.out.println(\"You entered: \" + {var_name});",
+                "        // Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'end':
+        else:
             node_code = [
-                "        System.out.println(\"🏁 Program is ending...\");",
-                f"        System.out.println(\"Final message: {node.value or 'Program complete'}\");",
-                "        // Basic concept: Programs should end cleanly",
-                "        return;  // Exit the main method",
-                ""
+                f"        System.out.println(\"📥 {value or 'Please enter data'}\");",
+                "        String userInput;  // Variable to store what user types",
+                "        System.out.print(\"Enter value: \");",
+                "        userInput = scanner.nextLine();  // Read user input",
+                "        System.out.println(\"You entered: \" + userInput);",
+                "        // Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'process':
-            variables = self._extract_variables_from_text(node.value or "")
+        node_code.append("")
+        return node_code
+
+    def _emit_output(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits displaying a result."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"        System.out.println(\"📤 Output: {value or 'Displaying result'}\");",
+            "        // Basic concept: Output shows results to users",
+        ]
+        if variables:
+            for var in variables:
+                node_code.append(f"        // System.out.println({var});  // Display {var}")
+        node_code.append("")
+        return node_code
+
+    def _emit_decision(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the condition and an if/else matching the number of outgoing paths."""
+        value = node.value
+        # Only the number of paths matters, so the successors are counted rather than listed
+        successor_count = graph.out_degree(node.id)
+        node_code = [
+            f"        System.out.println(\"🤔 Decision point: {value or 'Making a choice'}\");",
+            "        // Basic concept: Decisions are like yes/no questions",
+            "        // TODO: Replace 'true' with your actual condition",
+            f"        boolean decision_result = true;  // Condition: {value or 'Some condition'}",
+            ""
+        ]
+
+        if successor_count >= 2:
+            node_code.extend(_JAVA_DECISION_TWO_PATHS_LINES)
+        elif successor_count == 1:
+            node_code.extend(_JAVA_DECISION_ONE_PATH_LINES)
+        else:
+            node_code.extend(_JAVA_DECISION_NO_PATHS_LINES)
+        return node_code
+
+    def _emit_subroutine(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a call to the subroutine the node refers to."""
+        # Subroutine information comes from the node's graph attributes
+        func_name = node_attrs.get('subroutine_name')
+        params = node_attrs.get('subroutine_params', [])
+
+        if func_name:
             node_code = [
-                f"        System.out.println(\"⚙️ Processing: {node.value or 'Calculation step'}\");",
-                "        // Basic concept: This is where we do calculations or work",
+                f"        System.out.println(\"🔧 Calling subroutine: {func_name}\");",
+                "        // Basic concept: Subroutines are reusable blocks of code",
             ]
-            
-            if variables:
-                node_code.append(f"        // TODO: Replace this with actual processing logic for: {', '.join(variables)}")
-                for var in variables:
-                    node_code.append(f"        // Example: {var} = \"someValue\";  // Set {var} to a value")
+
+            if params:
+                node_code.extend([
+                    f"        // TODO: Pass actual arguments for parameters: {', '.join(params)}",
+                    f"        // {func_name}()  // Call with appropriate arguments"
+                ])
             else:
-                node_code.append("        // TODO: Add your processing logic here")
-                node_code.append("        // This represents a calculation or operation from your flowchart")
+                node_code.append(f"        // {func_name}()  // Call the subroutine")
             node_code.append("")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'input':
-            variables = self._extract_variables_from_text(node.value or "")
-            if variables:
-                var_name = variables[0]
-                node_code = [
-                    f"        System.out.println(\"📥 Input needed: {node.value}\");",
-                    f"        System.out.print(\"Please enter {var_name}: \");",
-                    f"        {var_name} = scanner.nextLine();  // Read user input into {var_name}",
-                    f"        System.out.println(\"You entered: \" + {var_name});",
-                    "        // Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    f"        System.out.println(\"📥 {node.value or 'Please enter data'}\");",
-                    "        String userInput;  // Variable to store what user types",
-                    "        System.out.print(\"Enter value: \");",
-                    "        userInput = scanner.nextLine();  // Read user input",
-                    "        System.out.println(\"You entered: \" + userInput);",
-                    "        // Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'output':
-            variables = self._extract_variables_from_text(node.value or "")
-            node_code = [
-                f"        System.out.println(\"📤 Output: {node.value or 'Displaying result'}\");",
-                "        // Basic concept: Output shows results to users",
-            ]
-            if variables:
-                for var in variables:
-                    node_code.append(f"        // System.out.println({var});  // Display {var}")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'decision':
-            successors = list(graph.successors(node.id))
-            node_code = [
-                f"        System.out.println(\"🤔 Decision point: {node.value or 'Making a choice'}\");",
-                "        // Basic concept: Decisions are like yes/no questions",
-                "        // TODO: Replace 'true' with your actual condition",
-                f"        boolean decision_result = true;  // Condition: {node.value or 'Some condition'}",
-                ""
-            ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-            if len(successors) >= 2:
-                node_code = [
-                    "        if (decision_result) {  // If condition is TRUE",
-                    "            System.out.println(\"→ Condition is TRUE, taking YES path\");",
-                    "            // Continue with YES path logic here",
-                    "        } else {  // If condition is FALSE", 
-                    "            System.out.println(\"→ Condition is FALSE, taking NO path\");",
-                    "            // Continue with NO path logic here",
-                    "        }",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            elif len(successors) == 1:
-                node_code = [
-                    "        if (decision_result) {  // If condition is TRUE",
-                    "            System.out.println(\"→ Condition is TRUE, continuing\");",
-                    "            // Continue with next step",
-                    "        } else {",
-                    "            System.out.println(\"→ Condition is FALSE, program ends\");",
-                    "            return;",
-                    "        }",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    "        System.out.println(\"⚠️ Warning: Decision has no paths to follow!\");",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-        elif node_type == 'subroutine':
-            # Get subroutine information from graph attributes
-            node_attrs = graph.nodes.get(node.id, {})
-            func_name = node_attrs.get('subroutine_name')
-            params = node_attrs.get('subroutine_params', [])
-            
-            if func_name:
-                node_code = [
-                    f"        System.out.println(\"🔧 Calling subroutine: {func_name}\");",
-                    "        // Basic concept: Subroutines are reusable blocks of code",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-                
-                if params:
-                    node_code = [
-                        f"        // TODO: Pass actual arguments for parameters: {', '.join(params)}",
-                        f"        // {func_name}()  // Call with appropriate arguments"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                else:
-                    node_code = [
-                        f"        // {func_name}()  // Call the subroutine"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                code_lines.append("")
-            else:
-                node_code = [
-                    f"        System.out.println(\"🔧 Subroutine call: {node.value or 'Unknown subroutine'}\");",
-                    "        // TODO: Replace with actual subroutine call",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
         else:
             node_code = [
-                f"        System.out.println(\"📋 Generic step: {node.value or 'Unknown step'}\");",
-                "        // This is a general flowchart element",
+                f"        System.out.println(\"🔧 Subroutine call: {node.value or 'Unknown subroutine'}\");",
+                "        // TODO: Replace with actual subroutine call",
                 ""
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
+        return node_code
 
-    def _generate_direct_java(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> str:
-        # Keep the old version for backward compatibility, but redirect to educational
-        return self._generate_educational_java(flowchart_data, graph)
+    def _emit_generic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a general step for node types without a dedicated emitter."""
+        return [
+            f"        System.out.println(\"📋 Generic step: {node.value or 'Unknown step'}\");",
+            "        // This is a general flowchart element",
+            ""
+        ]
+
+    # Node type -> emitter returning the node's uncolored code lines; node types without an entry use _emit_generic
+    _NODE_EMITTERS = {
+        'start': _emit_start,
+        'end': _emit_end,
+        'process': _emit_process,
+        'input': _emit_input,
+        'output': _emit_output,
+        'decision': _emit_decision,
+        'subroutine': _emit_subroutine,
+    }
+
+# Fixed blocks of the generated Python program, built once at import rather than on every call
+_PYTHON_HEADER_LINES = (
+    "# 🎓 EDUCATIONAL PYTHON CODE GENERATED FROM FLOWCHART",
+    "# ==================================================",
+    "# This code was generated from your flowchart. Comments explain each part.",
+    "#",
+    "# 📚 LEARNING NOTES:",
+    "# - Variables are like boxes that hold information",
+    "# - 'print()' displays text to the user",
+    "# - 'input()' gets information from the user",
+    "# - '#' creates a comment (notes for humans)",
+    "# - Programs run from top to bottom, line by line",
+    "# Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
+    "",
+)
+_PYTHON_SUBROUTINES_INTRO_LINES = (
+    "# 🔧 SUBROUTINES: These are reusable pieces of code",
+    "# Basic concept: Functions let us organize code into named blocks",
+    "# Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
+    "",
+)
+_PYTHON_MAIN_PROLOGUE_LINES = (
+    "def main():",
+    "    \"\"\"🚀 MAIN FUNCTION: Program execution starts here.\"\"\"",
+    "    print('=== FLOWCHART PROGRAM STARTING ===')",
+    "    print('This program follows your flowchart step by step!')",
+    "    print()",
+    "",
+)
+_PYTHON_VARIABLES_INTRO_LINES = (
+    "    # 📦 VARIABLES: These are like boxes that store information",
+    "    # Basic concept: Variables hold data we can use later",
+    "    # Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables",
+)
+_PYTHON_MAIN_EPILOGUE_LINES = (
+    "",
+    "    print()",
+    "    print('=== PROGRAM COMPLETED ===')",
+    "",
+    "",
+    "# 🎯 PROGRAM ENTRY POINT",
+    "# Basic concept: This line makes the program start when you run it",
+    "# Learn more: https://realpython.com/python-main-function/",
+    "if __name__ == '__main__':",
+    "    main()",
+    "",
+)
+# Node code that does not depend on the node's text
+_PYTHON_START_LINES = (
+    "    print('🚀 Starting the program...')",
+    "    # Basic concept: Every program needs a starting point",
+    "",
+)
+_PYTHON_DECISION_TWO_PATHS_LINES = (
+    "    if decision_result:",
+    "        print('→ Condition is TRUE, taking YES path')",
+    "        # Continue with YES path logic here",
+    "    else:",
+    "        print('→ Condition is FALSE, taking NO path')",
+    "        # Continue with NO path logic here",
+    "",
+)
+_PYTHON_DECISION_ONE_PATH_LINES = (
+    "    if decision_result:",
+    "        print('→ Condition is TRUE, continuing')",
+    "        # Continue with next step",
+    "    else:",
+    "        print('→ Condition is FALSE, program ends')",
+    "        return",
+    "",
+)
+_PYTHON_DECISION_NO_PATHS_LINES = (
+    "    print('⚠️ Warning: Decision has no paths to follow!')",
+    "",
+)
 
 class PythonCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
     """
     Generates educational Python code from a flowchart, focusing on clarity
     and direct correlation to the flowchart structure.
     """
+    # Generators hold no per-instance state
+    __slots__ = ()
+
     def generate_code(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph, idiomatic: bool = False) -> str:
-        if idiomatic:
-            return self._generate_educational_python(flowchart_data, graph) # Placeholder
-        else:
-            return self._generate_educational_python(flowchart_data, graph)
+        # Both styles currently produce the educational code; idiomatic output is still a placeholder
+        return self._generate_educational_python(flowchart_data, graph)
 
     def _generate_educational_python(self, flowchart_data: FlowchartDataSchema, graph: nx.DiGraph) -> str:
-        code_lines = [
-            "# 🎓 EDUCATIONAL PYTHON CODE GENERATED FROM FLOWCHART",
-            "# ==================================================",
-            "# This code was generated from your flowchart. Comments explain each part.",
-            "#",
-            "# 📚 LEARNING NOTES:",
-            "# - Variables are like boxes that hold information",
-            "# - 'print()' displays text to the user",
-            "# - 'input()' gets information from the user",
-            "# - '#' creates a comment (notes for humans)",
-            "# - Programs run from top to bottom, line by line",
-            "# Learn more: https://www.khanacademy.org/computing/computer-programming/programming/intro-to-programming/a/what-is-programming",
-            ""
-        ]
+        code_lines = list(_PYTHON_HEADER_LINES)
+
+        # Graph attributes of every node, read into a plain dict once instead of through graph.nodes per lookup
+        node_attr_map: Dict[str, Dict[str, Any]] = dict(graph.nodes(data=True))
 
-        # Collect all variables from flowchart
+        # Collect variables, subroutines and the node lookup in a single pass over the flowchart
         all_variables = set()
         subroutines = {}  # Dictionary to store subroutine definitions
+        node_map = {}  # Mapping from node ID to node object
         
         for node in flowchart_data.nodes:
+            node_map[node.id] = node
             if node.value:
                 all_variables.update(self._extract_variables_from_text(node.value))
             
             # Check if this is a subroutine node
-            node_attrs = graph.nodes.get(node.id, {})
+            node_attrs = node_attr_map.get(node.id, _NO_NODE_ATTRS)
             if node_attrs.get('type') == 'subroutine':
                 func_name = node_attrs.get('subroutine_name')
                 params = node_attrs.get('subroutine_params', [])
@@ -815,12 +931,7 @@ class PythonCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
 
         # Generate subroutine definitions first
         if subroutines:
-            code_lines.extend([
-                "# 🔧 SUBROUTINES: These are reusable pieces of code",
-                "# Basic concept: Functions let us organize code into named blocks",
-                "# Learn more: https://www.khanacademy.org/computing/computer-programming/programming/functions/a/functions",
-                ""
-            ])
+            code_lines.extend(_PYTHON_SUBROUTINES_INTRO_LINES)
             
             for func_name, sub_info in subroutines.items():
                 params_str = ', '.join(sub_info['params']) if sub_info['params'] else ''
@@ -839,246 +950,202 @@ class PythonCodeGenerator(CodeGenerator, EducationalCodeGeneratorBase):
                 code_lines.extend(colored_sub_code)
 
         # Generate main function with all logic inline
-        code_lines.extend([
-            "def main():",
-            "    \"\"\"🚀 MAIN FUNCTION: Program execution starts here.\"\"\"",
-            "    print('=== FLOWCHART PROGRAM STARTING ===')",
-            "    print('This program follows your flowchart step by step!')",
-            "    print()",
-            ""
-        ])
+        code_lines.extend(_PYTHON_MAIN_PROLOGUE_LINES)
 
         # Declare variables at the top of main
         if all_variables:
-            code_lines.append("    # 📦 VARIABLES: These are like boxes that store information")
-            code_lines.append("    # Basic concept: Variables hold data we can use later")
-            code_lines.append("    # Learn more: https://www.khanacademy.org/computing/computer-programming/programming/variables/a/intro-to-variables")
-            for var in sorted(list(all_variables)):
-                code_lines.append(f"    {var} = None  # Will store: {var}")
+            code_lines.extend(_PYTHON_VARIABLES_INTRO_LINES)
+            # One line per variable, joined into a single block since the declarations are never styled individually
+            code_lines.append('\n'.join([f"    {var} = None  # Will store: {var}" for var in sorted(all_variables)]))
             code_lines.append("")
 
-        # Use topological sort to get linear order of nodes
+        # Use topological sort to get linear order of nodes. Only the sort itself is guarded, and only
+        # against the cycle error it raises, so failures while generating code are not masked by the fallback.
         try:
             # Get topological order of nodes
             topo_order = list(nx.topological_sort(graph))
-            
-            # Create a mapping from node ID to node object
-            node_map = {node.id: node for node in flowchart_data.nodes}
-            
+            cycle_error = None
+        except nx.NetworkXUnfeasible as e:
+            cycle_error = e
+
+        if cycle_error is None:
             # Generate linear code for each node in topological order
             for i, node_id in enumerate(topo_order):
                 if node_id in node_map:
                     node = node_map[node_id]
-                    self._generate_inline_node_logic(node, graph, code_lines, i, len(topo_order))
-                    
-        except Exception as e:
-            # If graph has cycles or other issues, fall back to original node order
+                    self._generate_inline_node_logic(node, graph, code_lines, i, len(topo_order), node_attr_map)
+        else:
+            # If graph has cycles, fall back to original node order
             code_lines.append(f"    # ⚠️ Note: Flowchart has cycles or structural issues, using original order")
-            code_lines.append(f"    # Debug: {str(e)}")
+            code_lines.append(f"    # Debug: {str(cycle_error)}")
             for i, node in enumerate(flowchart_data.nodes):
-                self._generate_inline_node_logic(node, graph, code_lines, i, len(flowchart_data.nodes))
+                self._generate_inline_node_logic(node, graph, code_lines, i, len(flowchart_data.nodes), node_attr_map)
 
-        code_lines.extend([
-            "",
-            "    print()",
-            "    print('=== PROGRAM COMPLETED ===')",
-            "",
-            "",
-            "# 🎯 PROGRAM ENTRY POINT",
-            "# Basic concept: This line makes the program start when you run it",
-            "# Learn more: https://realpython.com/python-main-function/",
-            "if __name__ == '__main__':",
-            "    main()",
-            ""
-        ])
+        code_lines.extend(_PYTHON_MAIN_EPILOGUE_LINES)
         
         return '\n'.join(code_lines)
 
     def _generate_inline_node_logic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, 
-                                   code_lines: List[str], node_index: int, total_nodes: int):
+                                   code_lines: List[str], node_index: int, total_nodes: int,
+                                   node_attr_map: Dict[str, Dict[str, Any]]):
         """
         Generates inline logic for a single flowchart node within the main function.
         """
-        node_color = getattr(node, 'color', '#f0f0f0')  # Default to light gray
+        node_color = node.color  # Uncolored nodes (None) get the color helpers' default styling
+        node_type = node.type  # Read once for the step header and the emitter lookup
         
         # Add a creative step header with node color
-        readable_color = self._ensure_readable_color(node_color)
-        bg_color = self._get_subtle_background(node_color)
-        step_header_style = f"color: {readable_color}; background-color: {bg_color}; border: 2px solid {readable_color}; padding: 4px 8px; font-weight: bold; border-radius: 4px;"
-        step_header = f'<span style="{step_header_style}">🔹 STEP {node_index + 1}/{total_nodes} - {node.type.upper() if node.type else "STEP"}: {node.value or "Unknown"}</span>'
+        step_header_open = self._get_step_header_span_open(node_color)
+        step_header = f'{step_header_open}🔹 STEP {node_index + 1}/{total_nodes} - {node_type.upper() if node_type else "STEP"}: {node.value or "Unknown"}</span>'
         code_lines.append(step_header)
         code_lines.append("")
         
         # Add educational comment for this step (in gray)
         comment = self._get_educational_comment(node)
-        comment_lines = []
-        for line in comment.split('\n'):
-            comment_lines.append(f"    # {line.strip()}")
+        comment_lines = [f"    # {line.strip()}" for line in comment.split('\n')]
         comment_lines.append("")
         
         # Wrap comment lines with consistent gray color
         colored_comments = self._wrap_with_color(comment_lines, node_color, is_comment=True)
         code_lines.extend(colored_comments)
 
-        node_type = node.type or 'process'
+        emit = self._NODE_EMITTERS.get(node_type or 'process', PythonCodeGenerator._emit_generic)
+        node_code = emit(self, node, graph, node_attr_map.get(node.id, _NO_NODE_ATTRS))
+        # All code lines of the node share its color, so they are wrapped in a single pass
+        code_lines.extend(self._wrap_with_color(node_code, node_color))
 
-        if node_type == 'start':
+    def _emit_start(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program start."""
+        return _PYTHON_START_LINES
+
+    def _emit_end(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the program end."""
+        return [
+            "    print('🏁 Program is ending...')",
+            f"    print('Final message: {node.value or 'Program complete'}')",
+            "    # Basic concept: Programs should end cleanly",
+            "    return  # Exit the main function",
+            ""
+        ]
+
+    def _emit_process(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a processing step, with a TODO for each variable it mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"    print('⚙️ Processing: {value or 'Calculation step'}')",
+            "    # Basic concept: This is where we do calculations or work",
+        ]
+        if variables:
+            node_code.append(f"    # TODO: Replace this with actual processing logic for: {', '.join(variables)}")
+            for var in variables:
+                node_code.append(f"    # Example: {var} = some_calculation()  # Set {var} to a calculated value")
+        else:
+            node_code.append("    # TODO: Add your processing logic here")
+            node_code.append("    # This represents a calculation or operation from your flowchart")
+        node_code.append("")
+        return node_code
+
+    def _emit_input(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits reading user input into the first variable the node mentions."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        if variables:
+            var_name = variables[0]
             node_code = [
-                "    print('🚀 Starting the program...')",
-                "    # Basic concept: Every program needs a starting point",
-                ""
+                f"    print('📥 Input needed: {value}')",
+                f"    {var_name} = input('Please enter {var_name}: ')",
+                f"    print(f'You entered: {{{var_name}}}')",
+                "    # Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'end':
+        else:
             node_code = [
-                "    print('🏁 Program is ending...')",
-                f"    print('Final message: {node.value or 'Program complete'}')",
-                "    # Basic concept: Programs should end cleanly",
-                "    return  # Exit the main function",
-                ""
+                f"    print('📥 {value or 'Please enter data'}')",
+                "    user_input = input('Enter value: ')",
+                "    print(f'You entered: {user_input}')",
+                "    # Basic concept: Input lets users give data to our program",
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'process':
-            variables = self._extract_variables_from_text(node.value or "")
+        node_code.append("")
+        return node_code
+
+    def _emit_output(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits displaying a result."""
+        value = node.value
+        variables = self._extract_variables_from_text(value or "")
+        node_code = [
+            f"    print('📤 Output: {value or 'Displaying result'}')",
+            "    # Basic concept: Output shows results to users",
+        ]
+        if variables:
+            for var in variables:
+                node_code.append(f"    # print(f'Result: {{{var}}}')  # Display {var}")
+        node_code.append("")
+        return node_code
+
+    def _emit_decision(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits the condition and an if/else matching the number of outgoing paths."""
+        value = node.value
+        # Only the number of paths matters, so the successors are counted rather than listed
+        successor_count = graph.out_degree(node.id)
+        node_code = [
+            f"    print('🤔 Decision point: {value or 'Making a choice'}')",
+            "    # Basic concept: Decisions are like yes/no questions",
+            "    # TODO: Replace 'True' with your actual condition",
+            f"    decision_result = True  # Condition: {value or 'Some condition'}",
+            ""
+        ]
+
+        if successor_count >= 2:
+            node_code.extend(_PYTHON_DECISION_TWO_PATHS_LINES)
+        elif successor_count == 1:
+            node_code.extend(_PYTHON_DECISION_ONE_PATH_LINES)
+        else:
+            node_code.extend(_PYTHON_DECISION_NO_PATHS_LINES)
+        return node_code
+
+    def _emit_subroutine(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a call to the subroutine the node refers to."""
+        # Subroutine information comes from the node's graph attributes
+        func_name = node_attrs.get('subroutine_name')
+        params = node_attrs.get('subroutine_params', [])
+
+        if func_name:
             node_code = [
-                f"    print('⚙️ Processing: {node.value or 'Calculation step'}')",
-                "    # Basic concept: This is where we do calculations or work",
+                f"    print('🔧 Calling subroutine: {func_name}')",
+                "    # Basic concept: Subroutines are reusable blocks of code",
             ]
-            if variables:
-                node_code.append(f"    # TODO: Replace this with actual processing logic for: {', '.join(variables)}")
-                for var in variables:
-                    node_code.append(f"    # Example: {var} = some_calculation()  # Set {var} to a calculated value")
+
+            if params:
+                node_code.extend([
+                    f"    # TODO: Pass actual arguments for parameters: {', '.join(params)}",
+                    f"    # {func_name}()  # Call with appropriate arguments"
+                ])
             else:
-                node_code.append("    # TODO: Add your processing logic here")
-                node_code.append("    # This represents a calculation or operation from your flowchart")
+                node_code.append(f"    # {func_name}()  # Call the subroutine")
             node_code.append("")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-        elif node_type == 'input':
-            variables = self._extract_variables_from_text(node.value or "")
-            if variables:
-                var_name = variables[0]
-                node_code = [
-                    f"    print('📥 Input needed: {node.value}')",
-                    f"    {var_name} = input('Please enter {var_name}: ')",
-                    f"    print(f'You entered: {{{var_name}}}')",
-                    "    # Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    f"    print('📥 {node.value or 'Please enter data'}')",
-                    "    user_input = input('Enter value: ')",
-                    "    print(f'You entered: {user_input}')",
-                    "    # Basic concept: Input lets users give data to our program",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'output':
-            variables = self._extract_variables_from_text(node.value or "")
-            node_code = [
-                f"    print('📤 Output: {node.value or 'Displaying result'}')",
-                "    # Basic concept: Output shows results to users",
-            ]
-            if variables:
-                for var in variables:
-                    node_code.append(f"    # print(f'Result: {{{var}}}')  # Display {var}")
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            code_lines.append("")
-            
-        elif node_type == 'decision':
-            successors = list(graph.successors(node.id))
-            node_code = [
-                f"    print('🤔 Decision point: {node.value or 'Making a choice'}')",
-                "    # Basic concept: Decisions are like yes/no questions",
-                "    # TODO: Replace 'True' with your actual condition",
-                f"    decision_result = True  # Condition: {node.value or 'Some condition'}",
-                ""
-            ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code)
-            
-            if len(successors) >= 2:
-                node_code = [
-                    "    if decision_result:",
-                    "        print('→ Condition is TRUE, taking YES path')",
-                    "        # Continue with YES path logic here",
-                    "    else:",
-                    "        print('→ Condition is FALSE, taking NO path')",
-                    "        # Continue with NO path logic here",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            elif len(successors) == 1:
-                node_code = [
-                    "    if decision_result:",
-                    "        print('→ Condition is TRUE, continuing')",
-                    "        # Continue with next step",
-                    "    else:",
-                    "        print('→ Condition is FALSE, program ends')",
-                    "        return",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-            else:
-                node_code = [
-                    "    print('⚠️ Warning: Decision has no paths to follow!')",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-        elif node_type == 'subroutine':
-            # Get subroutine information from graph attributes
-            node_attrs = graph.nodes.get(node.id, {})
-            func_name = node_attrs.get('subroutine_name')
-            params = node_attrs.get('subroutine_params', [])
-            
-            if func_name:
-                node_code = [
-                    f"    print('🔧 Calling subroutine: {func_name}')",
-                    "    # Basic concept: Subroutines are reusable blocks of code",
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
-                
-                if params:
-                    node_code = [
-                        f"    # TODO: Pass actual arguments for parameters: {', '.join(params)}",
-                        f"    # {func_name}()  # Call with appropriate arguments"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                else:
-                    node_code = [
-                        f"    # {func_name}()  # Call the subroutine"
-                    ]
-                    colored_code = self._wrap_with_color(node_code, node_color)
-                    code_lines.extend(colored_code)
-                code_lines.append("")
-            else:
-                node_code = [
-                    f"    print('🔧 Subroutine call: {node.value or 'Unknown subroutine'}')",
-                    "    # TODO: Replace with actual subroutine call",
-                    ""
-                ]
-                colored_code = self._wrap_with_color(node_code, node_color)
-                code_lines.extend(colored_code)
         else:
             node_code = [
-                f"    print('📋 Generic step: {node.value or 'Unknown step'}')",
-                "    # This is a general flowchart element",
+                f"    print('🔧 Subroutine call: {node.value or 'Unknown subroutine'}')",
+                "    # TODO: Replace with actual subroutine call",
                 ""
             ]
-            colored_code = self._wrap_with_color(node_code, node_color)
-            code_lines.extend(colored_code) 
\ No newline at end of file
+        return node_code
+
+    def _emit_generic(self, node: FlowchartNodeSchema, graph: nx.DiGraph, node_attrs: Dict[str, Any]) -> Sequence[str]:
+        """Emits a general step for node types without a dedicated emitter."""
+        return [
+            f"    print('📋 Generic step: {node.value or 'Unknown step'}')",
+            "    # This is a general flowchart element",
+            ""
+        ]
+
+    # Node type -> emitter returning the node's uncolored code lines; node types without an entry use _emit_generic
+    _NODE_EMITTERS = {
+        'start': _emit_start,
+        'end': _emit_end,
+        'process': _emit_process,
+        'input': _emit_input,
+        'output': _emit_output,
+        'decision': _emit_decision,
+        'subroutine': _emit_subroutine,
+    }
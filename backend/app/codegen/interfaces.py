@@ -8,6 +8,8 @@ class CodeGenerator(ABC):
     Interface for a code generator that translates a flowchart into a specific programming language.
     '''
 
+    __slots__ = ()
+
     @abstractmethod
     def generate_code(
         self, 
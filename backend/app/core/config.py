@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+@dataclass
+class AssessmentConfig:
+    """
+    Settings that control how thoroughly the assessment engine analyzes a flowchart.
+    """
+    # If True, InfiniteLoopRule enumerates every simple cycle and reports each one without an exit.
+    # Otherwise it stops at the first offending cycle of each loop body, which is enough to point the
+    # student at the problem and avoids enumerating exponentially many cycles in tangled flowcharts.
+    exhaustive_cycles: bool = False
+    # Number of threads used to apply the analysis rules of one flowchart. 1 applies them serially.
+    # The rules are pure Python and hold the GIL, so more workers only pay off once rules spend
+    # their time in code that releases it.
+    rule_workers: int = 1
+    # Number of analyzed flowcharts whose results are kept for identical resubmissions. 0 disables the cache.
+    result_cache_size: int = 1024
+
+assessment_config = AssessmentConfig()
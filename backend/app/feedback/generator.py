@@ -1,27 +1,56 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from app.schemas.flowchart import AnalysisResult
 import re
 
+# Compiled once at import instead of going through re's pattern cache for every message
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_SYMBOL_TEXT_RE = re.compile(r"Symbol '([^']+)'")
+_PARENTHESIZED_RE = re.compile(r'\s*\([^)]*\)\s*')
+
+@lru_cache(maxsize=2048)
 def clean_html_from_text(text: str) -> str:
     """
     Removes HTML tags and entities from text to make it user-friendly.
+    Memoized, since the same node texts recur across results and re-analyses of a flowchart.
     """
     if not text:
         return text
     
+    # Most node texts hold no markup at all, so each pass is skipped unless its marker character occurs
+    clean_text = text
+    
     # Remove HTML tags
-    clean_text = re.sub(r'<[^>]+>', '', text)
+    if '<' in clean_text:
+        clean_text = _HTML_TAG_RE.sub('', clean_text)
     
     # Decode common HTML entities
-    clean_text = clean_text.replace('&lt;', '<')
-    clean_text = clean_text.replace('&gt;', '>')
-    clean_text = clean_text.replace('&amp;', '&')
-    clean_text = clean_text.replace('&quot;', '"')
-    clean_text = clean_text.replace('&#39;', "'")
-    clean_text = clean_text.replace('&nbsp;', ' ')
+    if '&' in clean_text:
+        clean_text = clean_text.replace('&lt;', '<')
+        clean_text = clean_text.replace('&gt;', '>')
+        clean_text = clean_text.replace('&amp;', '&')
+        clean_text = clean_text.replace('&quot;', '"')
+        clean_text = clean_text.replace('&#39;', "'")
+        clean_text = clean_text.replace('&nbsp;', ' ')
     
     return clean_text.strip()
 
+# Feedback groups, in the order their messages are reported
+_START_ISSUES, _END_ISSUES, _CONNECTION_ISSUES, _OTHER_ISSUES = range(4)
+
+@lru_cache(maxsize=256)
+def _feedback_group(rule_id: str) -> int:
+    """
+    Returns the feedback group of a rule ID. Memoized, since only a handful of rule IDs exist.
+    """
+    if 'START' in rule_id:
+        return _START_ISSUES
+    elif 'END' in rule_id:
+        return _END_ISSUES
+    elif 'UNCONNECTED' in rule_id or 'OUTGOING' in rule_id or 'INCOMING' in rule_id:
+        return _CONNECTION_ISSUES
+    return _OTHER_ISSUES
+
 def generate_feedback_messages(analysis_results: List[AnalysisResult]) -> List[str]:
     """
     Generates user-friendly feedback messages from analysis results.
@@ -39,37 +68,15 @@ def generate_feedback_messages(analysis_results: List[AnalysisResult]) -> List[s
         feedback_strings.append("✅ Great! Your flowchart structure looks good and follows all the basic rules.")
         return feedback_strings
 
-    # Group similar errors to provide better feedback
-    error_groups = {
-        'start_issues': [],
-        'end_issues': [],
-        'connection_issues': [],
-        'other_issues': []
-    }
-    
+    # Group similar errors to provide better feedback, keeping the groups in a fixed order
+    grouped_results: Tuple[List[AnalysisResult], ...] = ([], [], [], [])
     for result in analysis_results:
-        if 'START' in result.rule_id:
-            error_groups['start_issues'].append(result)
-        elif 'END' in result.rule_id:
-            error_groups['end_issues'].append(result)
-        elif 'UNCONNECTED' in result.rule_id or 'OUTGOING' in result.rule_id or 'INCOMING' in result.rule_id:
-            error_groups['connection_issues'].append(result)
-        else:
-            error_groups['other_issues'].append(result)
+        grouped_results[_feedback_group(result.rule_id)].append(result)
     
     # Generate user-friendly messages for each group
-    for group_name, results in error_groups.items():
-        if not results:
-            continue
-            
-        if group_name == 'start_issues':
-            feedback_strings.extend(_generate_start_feedback(results))
-        elif group_name == 'end_issues':
-            feedback_strings.extend(_generate_end_feedback(results))
-        elif group_name == 'connection_issues':
-            feedback_strings.extend(_generate_connection_feedback(results))
-        else:
-            feedback_strings.extend(_generate_other_feedback(results))
+    for generate_group_feedback, results in zip(_GROUP_FEEDBACK_GENERATORS, grouped_results):
+        if results:
+            feedback_strings.extend(generate_group_feedback(results))
     
     return feedback_strings
 
@@ -81,7 +88,8 @@ def _generate_start_feedback(results: List[AnalysisResult]) -> List[str]:
         if result.rule_id == "NO_START_SYMBOL":
             feedback.append("❌ **Missing Start Symbol**: Your flowchart needs exactly one 'Start' symbol to show where the program begins. Please add a start symbol (usually an oval or rounded rectangle).")
         elif result.rule_id == "MULTIPLE_START_SYMBOLS":
-            count = result.message.split('but ')[1].split(' were')[0] if 'but ' in result.message else "multiple"
+            # The rule reports the count as structured data, so the message text is not parsed
+            count = result.data.get("count", "multiple") if result.data else "multiple"
             feedback.append(f"❌ **Too Many Start Symbols**: Your flowchart has {count} start symbols, but it should have exactly one. Please remove the extra start symbols so there's only one entry point.")
         elif "START_SYMBOL_NO_OUTGOING" in result.rule_id:
             feedback.append("⚠️ **Disconnected Start**: Your start symbol isn't connected to anything. Please draw an arrow from the start symbol to the first step of your process.")
@@ -100,56 +108,76 @@ def _generate_end_feedback(results: List[AnalysisResult]) -> List[str]:
     
     return feedback
 
+# Connection feedback per rule ID: a template naming the cleaned symbol text, and a message for when there is none
+_CONNECTION_FEEDBACK_TEMPLATES = {
+    "UNCONNECTED_SYMBOL_BOTH": (
+        "⚠️ **Floating Element**: The element containing \"{symbol}\" is not connected to your flowchart. Please connect it with arrows to show the flow of your program.",
+        "⚠️ **Floating Element**: There's an element that's not connected to your flowchart. Please connect it with arrows to show the flow of your program.",
+    ),
+    "UNCONNECTED_SYMBOL_NO_INCOMING": (
+        "⚠️ **Missing Input Connection**: The element \"{symbol}\" has no incoming arrows. Please connect it to the previous step in your process.",
+        "⚠️ **Missing Input Connection**: There's an element with no incoming arrows. Please connect it to the previous step in your process.",
+    ),
+    "UNCONNECTED_SYMBOL_NO_OUTGOING": (
+        "⚠️ **Missing Output Connection**: The element \"{symbol}\" has no outgoing arrows. Please connect it to the next step in your process or to an end symbol.",
+        "⚠️ **Missing Output Connection**: There's an element with no outgoing arrows. Please connect it to the next step in your process or to an end symbol.",
+    ),
+}
+
 def _generate_connection_feedback(results: List[AnalysisResult]) -> List[str]:
     """Generate user-friendly feedback for connection issues."""
     feedback = []
     
     for result in results:
         # Clean HTML from node values to make them readable
-        if result.message and "Symbol '" in result.message:
+        # The message is a required string, so an empty one simply fails the substring check
+        if "Symbol '" in result.message:
             # Extract the symbol text and clean it
-            symbol_match = re.search(r"Symbol '([^']+)'", result.message)
+            symbol_match = _SYMBOL_TEXT_RE.search(result.message)
             if symbol_match:
                 raw_symbol = symbol_match.group(1)
                 clean_symbol = clean_html_from_text(raw_symbol)
                 
-                if result.rule_id == "UNCONNECTED_SYMBOL_BOTH":
+                templates = _CONNECTION_FEEDBACK_TEMPLATES.get(result.rule_id)
+                if templates:
+                    named_template, unnamed_message = templates
                     if clean_symbol and clean_symbol != raw_symbol:
-                        feedback.append(f"⚠️ **Floating Element**: The element containing \"{clean_symbol}\" is not connected to your flowchart. Please connect it with arrows to show the flow of your program.")
+                        feedback.append(named_template.format(symbol=clean_symbol))
                     else:
-                        feedback.append("⚠️ **Floating Element**: There's an element that's not connected to your flowchart. Please connect it with arrows to show the flow of your program.")
-                
-                elif result.rule_id == "UNCONNECTED_SYMBOL_NO_INCOMING":
-                    if clean_symbol and clean_symbol != raw_symbol:
-                        feedback.append(f"⚠️ **Missing Input Connection**: The element \"{clean_symbol}\" has no incoming arrows. Please connect it to the previous step in your process.")
-                    else:
-                        feedback.append("⚠️ **Missing Input Connection**: There's an element with no incoming arrows. Please connect it to the previous step in your process.")
-                
-                elif result.rule_id == "UNCONNECTED_SYMBOL_NO_OUTGOING":
-                    if clean_symbol and clean_symbol != raw_symbol:
-                        feedback.append(f"⚠️ **Missing Output Connection**: The element \"{clean_symbol}\" has no outgoing arrows. Please connect it to the next step in your process or to an end symbol.")
-                    else:
-                        feedback.append("⚠️ **Missing Output Connection**: There's an element with no outgoing arrows. Please connect it to the next step in your process or to an end symbol.")
+                        feedback.append(unnamed_message)
             else:
                 # Fallback for unmatched patterns
                 feedback.append("⚠️ **Connection Issue**: Some elements in your flowchart are not properly connected. Please check that all elements have appropriate arrows showing the flow.")
     
     return feedback
 
+# Icon shown in front of other feedback, per result severity
+_SEVERITY_ICONS = {"error": "❌", "warning": "⚠️"}
+_DEFAULT_SEVERITY_ICON = "ℹ️"
+
 def _generate_other_feedback(results: List[AnalysisResult]) -> List[str]:
     """Generate user-friendly feedback for other types of issues."""
     feedback = []
     
     for result in results:
-        severity_icon = "❌" if result.severity == "error" else "⚠️" if result.severity == "warning" else "ℹ️"
+        severity_icon = _SEVERITY_ICONS.get(result.severity, _DEFAULT_SEVERITY_ICON)
         
         # Clean the message of technical details
         clean_message = result.message
         # Remove node ID references like "(18)" or "(node_id)"
-        clean_message = re.sub(r'\s*\([^)]*\)\s*', ' ', clean_message)
-        # Clean up extra spaces
-        clean_message = re.sub(r'\s+', ' ', clean_message).strip()
+        if '(' in clean_message:
+            clean_message = _PARENTHESIZED_RE.sub(' ', clean_message)
+        # Clean up extra spaces; split() drops leading and trailing whitespace as strip() would
+        clean_message = ' '.join(clean_message.split())
         
         feedback.append(f"{severity_icon} {clean_message}")
     
-    return feedback 
\ No newline at end of file
+    return feedback
+
+# Feedback generator per group, indexed like the group constants above
+_GROUP_FEEDBACK_GENERATORS = (
+    _generate_start_feedback,
+    _generate_end_feedback,
+    _generate_connection_feedback,
+    _generate_other_feedback,
+)
@@ -1,11 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import flowchart_analyzer, code_generator_router
 
 app = FastAPI(
     title="Flowchart Learning & Analysis Tool API",
     description="API for analyzing flowcharts and generating code.",
-    version="0.2.0"
+    version="0.2.0",
+    # Responses are encoded with orjson rather than the standard library's json module
+    default_response_class=ORJSONResponse
 )
 
 # CORS (Cross-Origin Resource Sharing) Middleware
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Body, Query
-from typing import Dict, Type, Literal
+from typing import Dict, Literal
 import networkx as nx
 
 from app.schemas.flowchart import FlowchartDataSchema
@@ -9,11 +9,14 @@ from app.codegen.generators import CppCodeGenerator, JavaCodeGenerator, PythonCo
 
 router = APIRouter()
 
-GENERATOR_MAP: Dict[str, Type[CodeGenerator]] = {
-    "cpp": CppCodeGenerator,
-    "c++": CppCodeGenerator,
-    "java": JavaCodeGenerator,
-    "python": PythonCodeGenerator,
+# Generators hold no per-request state, so one shared instance per language serves every request
+_cpp_generator = CppCodeGenerator()
+
+GENERATOR_MAP: Dict[str, CodeGenerator] = {
+    "cpp": _cpp_generator,
+    "c++": _cpp_generator,
+    "java": JavaCodeGenerator(),
+    "python": PythonCodeGenerator(),
 }
 
 class CodeGenerationRequest(FlowchartDataSchema):
@@ -41,29 +44,28 @@ async def generate_code_endpoint(request_data: CodeGenerationRequest = Body(...)
 
     graph: nx.DiGraph
     try:
-        flowchart_model = FlowchartDataSchema(nodes=request_data.nodes, edges=request_data.edges)
-        graph = create_graph_from_flowchart_data(flowchart_model)
+        # The request is itself a validated FlowchartDataSchema, so it is used as is rather than copied
+        graph = create_graph_from_flowchart_data(request_data)
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail={"message": f"Error creating graph from flowchart data: {str(e)}", "code": "GRAPH_CREATION_FAILED"}
         )
 
-    generator_class = GENERATOR_MAP[language]
-    generator_instance = generator_class()
+    generator_instance = GENERATOR_MAP[language]
 
     # The 'idiomatic' parameter now maps to whether the style is 'direct'
     should_be_idiomatic = request_data.style == 'direct'
 
     try:
         generated_code = generator_instance.generate_code(
-            flowchart_data=flowchart_model, 
+            flowchart_data=request_data, 
             graph=graph, 
             idiomatic=should_be_idiomatic
         )
         return {"code": generated_code}
     except Exception as e:
-        print(f"Error during code generation with {generator_class.__name__} for '{language}': {e}")
+        print(f"Error during code generation with {type(generator_instance).__name__} for '{language}': {e}")
         raise HTTPException(
             status_code=500, 
             detail={"message": f"Error during code generation: {str(e)}", "code": "CODE_GENERATION_FAILED"}
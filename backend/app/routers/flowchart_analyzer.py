@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Body
-from typing import List
+from typing import List, Tuple
+import logging
 import networkx as nx
 
 from ..schemas.flowchart import FlowchartDataSchema, AnalysisResult, CombinedAnalysisResponse
@@ -7,13 +8,19 @@ from ..assessment.structural_checks import SingleStartMultipleEndRule, Unconnect
 from ..assessment.logical_checks import InfiniteLoopRule, UnreachableCodeRule, ParallelBranchBalanceRule, OrphanedIoRule
 from ..assessment.pedagogical_heuristics import DecisionNestingDepthRule
 from ..assessment.interfaces import AnalysisRule
+from ..assessment.engine import run_analysis_rules
+from ..assessment.result_cache import AnalysisResultCache
+from ..core.config import assessment_config
 from ..feedback.generator import generate_feedback_messages
 from ..utils.graph_constructor import create_graph_from_flowchart_data
+from ..services.assessment_batch import AssessmentBatchService, EMPTY_DATA_MESSAGE, MAX_BATCH_SIZE
 
 router = APIRouter()
 
-# Initialize rules
-analysis_rules: List[AnalysisRule] = [
+logger = logging.getLogger(__name__)
+
+# Initialize rules; a tuple, since the rule set is fixed for the lifetime of the app
+analysis_rules: Tuple[AnalysisRule, ...] = (
     SingleStartMultipleEndRule(),
     UnconnectedSymbolsRule(),
     InfiniteLoopRule(),
@@ -21,7 +28,12 @@ analysis_rules: List[AnalysisRule] = [
     ParallelBranchBalanceRule(),
     OrphanedIoRule(),
     DecisionNestingDepthRule()
-]
+)
+
+# Results of recently analyzed flowcharts, reused when a flowchart is submitted again unchanged
+analysis_result_cache = AnalysisResultCache(assessment_config.result_cache_size)
+
+assessment_batch_service = AssessmentBatchService(analysis_rules, analysis_result_cache)
 
 @router.post("/analyze_flowchart",
              summary="Analyze Flowchart Data and Generate Feedback",
@@ -66,56 +78,45 @@ async def analyze_flowchart_endpoint(flowchart_data: FlowchartDataSchema = Body(
     if not flowchart_data.nodes or len(flowchart_data.nodes) == 0:
         empty_result = AnalysisResult(
             rule_id="EMPTY_DATA_RECEIVED",
-            message="The flowchart is empty or could not be captured correctly. Please ensure your flowchart is not blank and try again.",
+            message=EMPTY_DATA_MESSAGE,
             severity="warning",
-            elements=[]
+            elements=()
         )
         return CombinedAnalysisResponse(
             analysis_results=[empty_result],
             feedback_messages=generate_feedback_messages([empty_result])
         )
         
-    all_analysis_results: List[AnalysisResult] = []
-    graph: nx.DiGraph
+    cache_key = analysis_result_cache.key_for(flowchart_data)
+    all_analysis_results = analysis_result_cache.get(cache_key)
 
-    try:
-        # Convert FlowchartData to NetworkX graph
-        graph = create_graph_from_flowchart_data(flowchart_data)
-        # For debugging or logging graph properties if needed
-        # print(f"Created graph with {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges.")
-
-    except Exception as e:
-        # Handle errors during graph creation itself, though less likely if FlowchartData is valid
-        print(f"Error creating graph from flowchart data: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-            detail={"message": f"Error processing flowchart structure: {str(e)}", "code": "GRAPH_CREATION_FAILED"}
-        )
+    if all_analysis_results is None:
+        graph: nx.DiGraph
 
-    for rule in analysis_rules:
         try:
-            # Pass both Pydantic model and NetworkX graph to the rule
-            results = rule.apply(flowchart_data, graph)
-            all_analysis_results.extend(results)
+            # Convert FlowchartData to NetworkX graph
+            graph = create_graph_from_flowchart_data(flowchart_data)
+            # For debugging or logging graph properties if needed
+            # print(f"Created graph with {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges.")
+
         except Exception as e:
-            # Log the exception from the rule appropriately in a real application
-            print(f"Error during rule execution '{rule.__class__.__name__}': {e}")
-            # Add a system error result for this rule failure
-            all_analysis_results.append(AnalysisResult(
-                rule_id="RULE_EXECUTION_ERROR",
-                message=f"Rule '{rule.__class__.__name__}' failed to execute: {str(e)}",
-                severity="system_error",
-                elements=[] # No specific elements, as it's a rule system error
-            ))
-            # Optionally, re-raise if you want to halt all analysis on a single rule failure,
-            # or continue to process other rules (current behavior).
+            # Handle errors during graph creation itself, though less likely if FlowchartData is valid
+            print(f"Error creating graph from flowchart data: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+                detail={"message": f"Error processing flowchart structure: {str(e)}", "code": "GRAPH_CREATION_FAILED"}
+            )
+
+        # Apply all rules; graph-wide analyses are computed once and shared between them
+        all_analysis_results = run_analysis_rules(analysis_rules, flowchart_data, graph)
+        analysis_result_cache.put(cache_key, all_analysis_results)
     
     # Generate human-readable feedback from the analysis results
     feedback_list = generate_feedback_messages(all_analysis_results) 
     
-    # Log the feedback for backend monitoring
-    print(f"Analyzed flowchart: {len(flowchart_data.nodes)} nodes, {len(flowchart_data.edges)} edges.")
-    print(f"Generated feedback (for logging): {feedback_list}")
+    # Log the feedback for backend monitoring; formatted only when debug logging is enabled
+    logger.debug("Analyzed flowchart: %d nodes, %d edges.", len(flowchart_data.nodes), len(flowchart_data.edges))
+    logger.debug("Generated feedback (for logging): %s", feedback_list)
     
     # Return the combined structured results and feedback messages
     return CombinedAnalysisResponse(
@@ -123,6 +124,36 @@ async def analyze_flowchart_endpoint(flowchart_data: FlowchartDataSchema = Body(
         feedback_messages=feedback_list
     )
 
+@router.post("/analyze_flowchart/batch",
+             summary="Analyze Several Flowcharts in One Request",
+             description=f"Receives a list of up to {MAX_BATCH_SIZE} flowcharts and analyzes each of them like /analyze_flowchart, sharing graph construction and rule setup across the batch.",
+             response_description="One combined analysis response per flowchart, in the order they were submitted.",
+             response_model=List[CombinedAnalysisResponse],
+             status_code=status.HTTP_200_OK
+            )
+async def analyze_flowchart_batch_endpoint(flowcharts: List[FlowchartDataSchema] = Body(..., max_length=MAX_BATCH_SIZE)):
+    """
+    Analyzes each flowchart of the batch and returns their combined responses in submission order.
+    """
+    try:
+        batch_results = assessment_batch_service.run(flowcharts)
+    except Exception as e:
+        print(f"Error analyzing flowchart batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": f"Error processing flowchart structure: {str(e)}", "code": "GRAPH_CREATION_FAILED"}
+        )
+
+    logger.debug("Analyzed flowchart batch: %d flowcharts.", len(flowcharts))
+
+    return [
+        CombinedAnalysisResponse(
+            analysis_results=analysis_results,
+            feedback_messages=generate_feedback_messages(analysis_results)
+        )
+        for analysis_results in batch_results
+    ]
+
 # The old return for reference, now replaced by feedback_list:
     # return {
     #     "message": "Flowchart data received, parsed, and graph created successfully",
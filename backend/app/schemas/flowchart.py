@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional, Tuple
+import sys
 
 class FlowchartNodeSchema(BaseModel):
     id: str
@@ -11,6 +12,13 @@ class FlowchartNodeSchema(BaseModel):
     color: Optional[str] = None  # Hex color for the node
     # TODO: Add geometry if needed later, matching the frontend TODO
 
+    @field_validator('type')
+    @classmethod
+    def _canonicalize_type(cls, value: Optional[str]) -> Optional[str]:
+        # Lowercased and interned once at ingestion, so analysis rules can compare
+        # node types directly without calling .lower() in their loops.
+        return sys.intern(value.lower()) if value is not None else value
+
 class FlowchartEdgeSchema(BaseModel):
     id: str
     value: Optional[str] = None
@@ -28,7 +36,10 @@ class AnalysisResult(BaseModel):
     rule_id: str
     message: str
     severity: str # e.g., "error", "warning", "info"
-    elements: Optional[List[str]] = None # IDs of flowchart elements involved
+    elements: Tuple[str, ...] = () # IDs of flowchart elements involved; serialized as a list
+    # Structured details behind the message (e.g. {"count": 3}) for the feedback generator;
+    # kept out of API responses so their shape does not change
+    data: Optional[Dict[str, Any]] = Field(default=None, exclude=True)
 
 class CombinedAnalysisResponse(BaseModel):
     analysis_results: List[AnalysisResult]
@@ -0,0 +1,67 @@
+from typing import List, Optional, Sequence
+import networkx as nx
+
+from app.schemas.flowchart import FlowchartDataSchema, AnalysisResult
+from app.assessment.interfaces import AnalysisRule
+from app.assessment.engine import run_analysis_rules
+from app.assessment.result_cache import AnalysisResultCache
+from app.utils.graph_constructor import create_graph_from_flowchart_data
+
+# Upper bound on the number of flowcharts accepted in one batch request
+MAX_BATCH_SIZE = 1000
+
+EMPTY_DATA_MESSAGE = "The flowchart is empty or could not be captured correctly. Please ensure your flowchart is not blank and try again."
+
+class AssessmentBatchService:
+    """
+    Applies a fixed set of analysis rules to many flowcharts in one call.
+
+    Flowcharts are assessed one after another against the same rule instances, and a single
+    NetworkX graph is cleared and refilled for each of them instead of allocating a new graph
+    per flowchart. When a result cache is given, flowcharts that were already analyzed are answered
+    from it without building a graph.
+    """
+
+    def __init__(self, rules: Sequence[AnalysisRule], result_cache: Optional[AnalysisResultCache] = None):
+        self.rules = rules
+        self.result_cache = result_cache
+
+    def run(self, batch: List[FlowchartDataSchema]) -> List[List[AnalysisResult]]:
+        """
+        Assesses every flowchart in the batch.
+
+        Args:
+            batch: The flowcharts to assess.
+
+        Returns:
+            One list of AnalysisResult objects per flowchart, in the order of the batch.
+            Empty flowcharts get a single EMPTY_DATA_RECEIVED warning, as with single requests.
+        """
+        graph = nx.DiGraph()
+        batch_results: List[List[AnalysisResult]] = []
+
+        for flowchart_data in batch:
+            if not flowchart_data.nodes:
+                batch_results.append([AnalysisResult(
+                    rule_id="EMPTY_DATA_RECEIVED",
+                    message=EMPTY_DATA_MESSAGE,
+                    severity="warning",
+                    elements=()
+                )])
+                continue
+
+            analysis_results = None
+            if self.result_cache is not None:
+                cache_key = self.result_cache.key_for(flowchart_data)
+                analysis_results = self.result_cache.get(cache_key)
+
+            if analysis_results is None:
+                # The graph only lives for the duration of one assessment, so it can be reused for the next
+                create_graph_from_flowchart_data(flowchart_data, graph)
+                analysis_results = run_analysis_rules(self.rules, flowchart_data, graph)
+                if self.result_cache is not None:
+                    self.result_cache.put(cache_key, analysis_results)
+
+            batch_results.append(analysis_results)
+
+        return batch_results
@@ -0,0 +1,23 @@
+import logging
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from httpx import AsyncClient, ASGITransport
+
+from ..main import app
+from ..utils import graph_constructor
+
+# Skipped-edge warnings are expected for the malformed flowcharts used in tests
+graph_constructor.logger.setLevel(logging.ERROR)
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def ac():
+    """An HTTP client for the app, created once and shared by all tests of a module."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def client():
+    """A synchronous test client for the app; its startup and shutdown run once per test session."""
+    with TestClient(app) as test_client:
+        yield test_client
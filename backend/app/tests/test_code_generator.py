@@ -1,9 +1,6 @@
 import pytest
-from httpx import AsyncClient, ASGITransport
 from fastapi import status
 
-from ..main import app
-
 BASE_URL = "/api/v1/codegen/generate_code"
 
 # A standard, simple flowchart for testing all generators
@@ -19,17 +16,16 @@ SIMPLE_FLOWCHART_PAYLOAD = {
     ]
 }
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 @pytest.mark.parametrize("language, expected_keywords", [
     ("python", ["def main():", "STEP 1 of", "STEP 2 of", "STEP 3 of"]),
     ("cpp", ["int main()", "STEP 1 of", "STEP 2 of", "STEP 3 of"]),
     ("java", ["public static void main", "STEP 1 of", "STEP 2 of", "STEP 3 of"])
 ])
-async def test_generate_code_for_all_languages(language, expected_keywords):
+async def test_generate_code_for_all_languages(ac, language, expected_keywords):
     """Test successful code generation for each supported language with linear structure."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {**SIMPLE_FLOWCHART_PAYLOAD, "language": language}
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {**SIMPLE_FLOWCHART_PAYLOAD, "language": language}
+    response = await ac.post(BASE_URL, json=payload)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -47,27 +43,25 @@ async def test_generate_code_for_all_languages(language, expected_keywords):
     elif language == "java":
         assert "public static void flowchartStep" not in generated_code
 
-@pytest.mark.asyncio
-async def test_generate_code_unsupported_language():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_generate_code_unsupported_language(ac):
     """Test that requesting an unsupported language returns a 400 error."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {**SIMPLE_FLOWCHART_PAYLOAD, "language": "cobol"}
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {**SIMPLE_FLOWCHART_PAYLOAD, "language": "cobol"}
+    response = await ac.post(BASE_URL, json=payload)
     
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     data = response.json()
     assert "Unsupported language" in data["detail"]["message"]
 
-@pytest.mark.asyncio
-async def test_generate_code_with_educational_style():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_generate_code_with_educational_style(ac):
     """Test that the default 'educational' style includes explanatory comments."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
-            **SIMPLE_FLOWCHART_PAYLOAD,
-            "language": "python",
-            "style": "educational"
-        }
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {
+        **SIMPLE_FLOWCHART_PAYLOAD,
+        "language": "python",
+        "style": "educational"
+    }
+    response = await ac.post(BASE_URL, json=payload)
         
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -75,16 +69,15 @@ async def test_generate_code_with_educational_style():
     assert "EDUCATIONAL PYTHON CODE" in data["code"]
     assert "Program execution starts here" in data["code"]
 
-@pytest.mark.asyncio
-async def test_generate_code_with_invalid_flowchart_data():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_generate_code_with_invalid_flowchart_data(ac):
     """Test that malformed flowchart data returns a 422 error."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        # Malformed payload (nodes is not a list)
-        payload = {
-            "nodes": {"id": "n1"},
-            "edges": [],
-            "language": "python"
-        }
-        response = await ac.post(BASE_URL, json=payload)
+    # Malformed payload (nodes is not a list)
+    payload = {
+        "nodes": {"id": "n1"},
+        "edges": [],
+        "language": "python"
+    }
+    response = await ac.post(BASE_URL, json=payload)
     
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY 
\ No newline at end of file
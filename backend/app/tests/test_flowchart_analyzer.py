@@ -1,28 +1,24 @@
 import pytest
-from httpx import AsyncClient, ASGITransport
 from fastapi import status
 
-from ..main import app
-
 # The base URL is now pointing to the new prefixed path
 BASE_URL = "/api/v1/analysis/analyze_flowchart"
 
-@pytest.mark.asyncio
-async def test_analyze_flowchart_valid_simple():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_valid_simple(ac):
     """Test analysis of a basic, valid flowchart."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
-            "nodes": [
-                {"id": "n1", "value": "Start", "style": "ellipse", "type": "start"},
-                {"id": "n2", "value": "Do something", "style": "rect", "type": "process"},
-                {"id": "n3", "value": "End", "style": "ellipse", "type": "end"}
-            ],
-            "edges": [
-                {"id": "e1", "sourceId": "n1", "targetId": "n2"},
-                {"id": "e2", "sourceId": "n2", "targetId": "n3"}
-            ]
-        }
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {
+        "nodes": [
+            {"id": "n1", "value": "Start", "style": "ellipse", "type": "start"},
+            {"id": "n2", "value": "Do something", "style": "rect", "type": "process"},
+            {"id": "n3", "value": "End", "style": "ellipse", "type": "end"}
+        ],
+        "edges": [
+            {"id": "e1", "sourceId": "n1", "targetId": "n2"},
+            {"id": "e2", "sourceId": "n2", "targetId": "n3"}
+        ]
+    }
+    response = await ac.post(BASE_URL, json=payload)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -32,63 +28,45 @@ async def test_analyze_flowchart_valid_simple():
     assert not any(r['severity'] in ['error', 'warning'] for r in data['analysis_results'])
     assert len(data['feedback_messages']) > 0
 
-@pytest.mark.asyncio
-async def test_analyze_flowchart_no_start_symbol():
-    """Test for 'NO_START_SYMBOL' error when no start node is present."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
+# Flowcharts that must trigger a rule, with the rule ID and a fragment of the expected feedback
+RULE_CASES = [
+    pytest.param(
+        # 'NO_START_SYMBOL' error when no start node is present
+        {
             "nodes": [{"id": "n1", "value": "Process", "style": "rect"}],
             "edges": []
-        }
-        response = await ac.post(BASE_URL, json=payload)
-        
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert any(r['rule_id'] == 'NO_START_SYMBOL' for r in data['analysis_results'])
-    assert any("must have exactly one start symbol, but none was found" in msg for msg in data['feedback_messages'])
-
-@pytest.mark.asyncio
-async def test_analyze_flowchart_multiple_start_symbols():
-    """Test for 'MULTIPLE_START_SYMBOLS' error."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
+        },
+        'NO_START_SYMBOL', "must have exactly one start symbol, but none was found",
+        id="no_start_symbol"
+    ),
+    pytest.param(
+        # 'MULTIPLE_START_SYMBOLS' error
+        {
             "nodes": [
                 {"id": "n1", "value": "Start 1", "style": "ellipse"},
                 {"id": "n2", "value": "Start 2", "style": "ellipse"}
             ],
             "edges": []
-        }
-        response = await ac.post(BASE_URL, json=payload)
-
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert any(r['rule_id'] == 'MULTIPLE_START_SYMBOLS' for r in data['analysis_results'])
-    assert any("must have exactly one start symbol, but 2 were found" in msg for msg in data['feedback_messages'])
-
-@pytest.mark.asyncio
-async def test_analyze_flowchart_unreachable_code():
-    """Test for 'UNREACHABLE_CODE' warning."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
+        },
+        'MULTIPLE_START_SYMBOLS', "must have exactly one start symbol, but 2 were found",
+        id="multiple_start_symbols"
+    ),
+    pytest.param(
+        # 'UNREACHABLE_CODE' warning
+        {
             "nodes": [
                 {"id": "n1", "value": "Start", "style": "ellipse"},
                 {"id": "n2", "value": "End", "style": "ellipse"},
                 {"id": "n3", "value": "Unreachable", "style": "rect"} # This node is not connected
             ],
             "edges": [{"id": "e1", "sourceId": "n1", "targetId": "n2"}]
-        }
-        response = await ac.post(BASE_URL, json=payload)
-
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert any(r['rule_id'] == 'UNREACHABLE_CODE' for r in data['analysis_results'])
-    assert any("is unreachable from any start node" in msg for msg in data['feedback_messages'])
-
-@pytest.mark.asyncio
-async def test_analyze_flowchart_infinite_loop():
-    """Test for 'MISSING_LOOP_EXIT' error."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
+        },
+        'UNREACHABLE_CODE', "is unreachable from any start node",
+        id="unreachable_code"
+    ),
+    pytest.param(
+        # 'MISSING_LOOP_EXIT' error
+        {
             "nodes": [
                 {"id": "n1", "value": "Start", "style": "ellipse"},
                 {"id": "n2", "value": "Process 1", "style": "rect"},
@@ -99,50 +77,56 @@ async def test_analyze_flowchart_infinite_loop():
                 {"id": "e2", "sourceId": "n2", "targetId": "n3"},
                 {"id": "e3", "sourceId": "n3", "targetId": "n2"} # Loop back with no decision
             ]
-        }
-        response = await ac.post(BASE_URL, json=payload)
+        },
+        'MISSING_LOOP_EXIT', "potential infinite loop was detected",
+        id="infinite_loop"
+    ),
+]
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("payload, rule_id, feedback_fragment", RULE_CASES)
+async def test_analyze_flowchart_rule(ac, payload, rule_id, feedback_fragment):
+    """Test that each flowchart triggers its rule and the matching feedback message."""
+    response = await ac.post(BASE_URL, json=payload)
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert any(r['rule_id'] == 'MISSING_LOOP_EXIT' for r in data['analysis_results'])
-    assert any("potential infinite loop was detected" in msg for msg in data['feedback_messages'])
+    assert any(r['rule_id'] == rule_id for r in data['analysis_results'])
+    assert any(feedback_fragment in msg for msg in data['feedback_messages'])
 
-@pytest.mark.asyncio
-async def test_analyze_flowchart_empty_data_payload():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_empty_data_payload(ac):
     """Test server response for a completely empty request body."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {} # Empty JSON object
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {} # Empty JSON object
+    response = await ac.post(BASE_URL, json=payload)
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
-@pytest.mark.asyncio
-async def test_analyze_flowchart_empty_nodes_list():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_empty_nodes_list(ac):
     """Test server response for request with empty nodes list."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {"nodes": [], "edges": []}
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {"nodes": [], "edges": []}
+    response = await ac.post(BASE_URL, json=payload)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert any(r['rule_id'] == 'EMPTY_DATA_RECEIVED' for r in data['analysis_results'])
 
-@pytest.mark.asyncio
-async def test_analyze_flowchart_type_normalization():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_type_normalization(ac):
     """Test that shape-based type normalization correctly identifies nodes."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        payload = {
-            "nodes": [
-                # No 'type' field, should be inferred from style
-                {"id": "n1", "value": "Start", "style": "ellipse"},
-                {"id": "n2", "value": "Is it valid?", "style": "rhombus"},
-                {"id": "n3", "value": "End", "style": "ellipse"},
-            ],
-            "edges": [
-                {"id": "e1", "sourceId": "n1", "targetId": "n2"},
-                {"id": "e2", "sourceId": "n2", "targetId": "n3"}
-            ]
-        }
-        response = await ac.post(BASE_URL, json=payload)
+    payload = {
+        "nodes": [
+            # No 'type' field, should be inferred from style
+            {"id": "n1", "value": "Start", "style": "ellipse"},
+            {"id": "n2", "value": "Is it valid?", "style": "rhombus"},
+            {"id": "n3", "value": "End", "style": "ellipse"},
+        ],
+        "edges": [
+            {"id": "e1", "sourceId": "n1", "targetId": "n2"},
+            {"id": "e2", "sourceId": "n2", "targetId": "n3"}
+        ]
+    }
+    response = await ac.post(BASE_URL, json=payload)
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -150,3 +134,77 @@ async def test_analyze_flowchart_type_normalization():
     # No 'DECISION_SINGLE_BRANCH' means n2 was seen as a decision.
     assert not any(r['rule_id'] == 'MULTIPLE_START_SYMBOLS' for r in data['analysis_results'])
     assert any(r['rule_id'] == 'DECISION_SINGLE_BRANCH' for r in data['analysis_results'])
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_deep_nesting(ac):
+    """Test for 'DEEP_NESTING' info on a chain of nested decisions with many alternative paths."""
+    nodes = [{"id": "s", "value": "Start", "style": "ellipse", "type": "start"}]
+    edges = []
+    previous = "s"
+    for i in range(4):
+        nodes.append({"id": f"d{i}", "value": f"Check {i}?", "style": "rhombus", "type": "decision"})
+        nodes.append({"id": f"p{i}", "value": f"Step {i}", "style": "rect", "type": "process"})
+        edges.append({"id": f"e{i}a", "sourceId": previous, "targetId": f"d{i}"})
+        edges.append({"id": f"e{i}b", "sourceId": f"d{i}", "targetId": f"p{i}"})
+        edges.append({"id": f"e{i}c", "sourceId": f"d{i}", "targetId": f"q{i}"})
+        nodes.append({"id": f"q{i}", "value": f"Other {i}", "style": "rect", "type": "process"})
+        edges.append({"id": f"e{i}d", "sourceId": f"p{i}", "targetId": f"j{i}"})
+        edges.append({"id": f"e{i}e", "sourceId": f"q{i}", "targetId": f"j{i}"})
+        nodes.append({"id": f"j{i}", "value": f"Join {i}", "style": "rect", "type": "process"})
+        previous = f"j{i}"
+
+    response = await ac.post(BASE_URL, json={"nodes": nodes, "edges": edges})
+
+    assert response.status_code == status.HTTP_200_OK
+    deep = [r for r in response.json()['analysis_results'] if r['rule_id'] == 'DEEP_NESTING']
+    # Only the fourth decision has three decisions before it on every path from the start.
+    assert [r['elements'] for r in deep] == [["d3"]]
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_batch(ac):
+    """Test that a batch returns one response per flowchart, in order, matching single requests."""
+    valid = {
+        "nodes": [
+            {"id": "n1", "value": "Start", "style": "ellipse", "type": "start"},
+            {"id": "n2", "value": "Do something", "style": "rect", "type": "process"},
+            {"id": "n3", "value": "End", "style": "ellipse", "type": "end"}
+        ],
+        "edges": [
+            {"id": "e1", "sourceId": "n1", "targetId": "n2"},
+            {"id": "e2", "sourceId": "n2", "targetId": "n3"}
+        ]
+    }
+    no_start = {"nodes": [{"id": "n1", "value": "Process", "style": "rect"}], "edges": []}
+    empty = {"nodes": [], "edges": []}
+
+    response = await ac.post(f"{BASE_URL}/batch", json=[valid, no_start, empty])
+    single = await ac.post(BASE_URL, json=no_start)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data) == 3
+    assert not any(r['severity'] in ['error', 'warning'] for r in data[0]['analysis_results'])
+    assert data[1] == single.json()
+    assert [r['rule_id'] for r in data[2]['analysis_results']] == ['EMPTY_DATA_RECEIVED']
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_analyze_flowchart_resubmission(ac):
+    """Test that an unchanged resubmission gets the same response and an edited one is analyzed again."""
+    payload = {
+        "nodes": [
+            {"id": "n1", "value": "Start", "style": "ellipse", "type": "start"},
+            {"id": "n2", "value": "Floating step", "style": "rect", "type": "process"},
+            {"id": "n3", "value": "End", "style": "ellipse", "type": "end"}
+        ],
+        "edges": [{"id": "e1", "sourceId": "n1", "targetId": "n3"}]
+    }
+    edited = {**payload, "nodes": payload["nodes"][:1] + [{**payload["nodes"][1], "value": "Renamed step"}] + payload["nodes"][2:]}
+
+    first = await ac.post(BASE_URL, json=payload)
+    again = await ac.post(BASE_URL, json=payload)
+    renamed = await ac.post(BASE_URL, json=edited)
+
+    assert first.status_code == again.status_code == renamed.status_code == status.HTTP_200_OK
+    assert again.json() == first.json()
+    assert any("Renamed step" in r['message'] for r in renamed.json()['analysis_results'])
+    assert not any("Floating step" in r['message'] for r in renamed.json()['analysis_results'])
@@ -1,9 +1,4 @@
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
-
-def test_read_health():
+def test_read_health(client):
     """
     Test the /health endpoint to ensure it returns a 200 OK status and the correct message.
     """
@@ -11,7 +6,7 @@ def test_read_health():
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
-def test_cors_headers():
+def test_cors_headers(client):
     """
     Test that CORS headers are present on responses, allowing cross-origin requests.
     We check this by sending an OPTIONS request, which triggers a preflight check.
@@ -27,7 +22,7 @@ def test_cors_headers():
     assert "access-control-allow-methods" in response.headers
     assert "access-control-allow-headers" in response.headers
 
-def test_root_endpoint():
+def test_root_endpoint(client):
     """
     Test the root endpoint to ensure it returns the welcome message.
     """
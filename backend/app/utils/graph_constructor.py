@@ -1,59 +1,75 @@
+from functools import lru_cache
+import logging
 import networkx as nx
 from typing import Dict, Any, Tuple, List, Optional
 from ..schemas.flowchart import FlowchartDataSchema, FlowchartNodeSchema, FlowchartEdgeSchema
 from .type_normalizer import normalize_node_type
 import re
 
-def parse_subroutine_info(value: str) -> Tuple[Optional[str], List[str]]:
+logger = logging.getLogger(__name__)
+
+# Subroutine text patterns, compiled once at import and tried in this order
+_KEYWORD_DEFINITION_RE = re.compile(r'(?:function|def|void|int|float|double|string|subroutine|procedure|method)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', re.IGNORECASE)
+_CALL_WITH_PARAMS_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)')
+_CALL_KEYWORD_RE = re.compile(r'(?:call|invoke)\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+_BARE_NAME_RE = re.compile(r'^([a-zA-Z_][a-zA-Z0-9_]*)$')
+
+@lru_cache(maxsize=1024)
+def parse_subroutine_info(value: str) -> Tuple[Optional[str], Tuple[str, ...]]:
     """
     Extracts subroutine name and parameters from a node's value text.
+    Memoized, since the same subroutine label often appears on several nodes;
+    the parameters are returned as a tuple so that cached results cannot be mutated.
     
     Args:
         value: The text content of the subroutine node
         
     Returns:
-        Tuple of (function_name, parameter_list)
+        Tuple of (function_name, parameter_tuple)
     """
     if not value:
-        return None, []
+        return None, ()
     
     value = value.strip()
     
-    # Pattern 1: function name(param1, param2, ...)
-    pattern1 = r'(?:function|def|void|int|float|double|string|subroutine|procedure|method)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'
-    match1 = re.search(pattern1, value, re.IGNORECASE)
-    if match1:
-        func_name = match1.group(1)
-        params_str = match1.group(2).strip()
-        params = [p.strip() for p in params_str.split(',') if p.strip()] if params_str else []
-        return func_name, params
-    
-    # Pattern 2: just name(param1, param2, ...)
-    pattern2 = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'
-    match2 = re.search(pattern2, value)
-    if match2:
-        func_name = match2.group(1)
-        params_str = match2.group(2).strip()
-        params = [p.strip() for p in params_str.split(',') if p.strip()] if params_str else []
-        return func_name, params
+    # Patterns 1 and 2 both need a parameter list, so they are only tried when there is one
+    if '(' in value:
+        # Pattern 1: function name(param1, param2, ...)
+        match1 = _KEYWORD_DEFINITION_RE.search(value)
+        if match1:
+            func_name = match1.group(1)
+            params_str = match1.group(2).strip()
+            params = tuple(p.strip() for p in params_str.split(',') if p.strip()) if params_str else ()
+            return func_name, params
+        
+        # Pattern 2: just name(param1, param2, ...)
+        match2 = _CALL_WITH_PARAMS_RE.search(value)
+        if match2:
+            func_name = match2.group(1)
+            params_str = match2.group(2).strip()
+            params = tuple(p.strip() for p in params_str.split(',') if p.strip()) if params_str else ()
+            return func_name, params
     
     # Pattern 3: call/invoke function_name
-    pattern3 = r'(?:call|invoke)\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-    match3 = re.search(pattern3, value, re.IGNORECASE)
+    match3 = _CALL_KEYWORD_RE.search(value)
     if match3:
         func_name = match3.group(1)
-        return func_name, []  # Call without visible parameters
+        return func_name, ()  # Call without visible parameters
     
     # Pattern 4: just a function name (assume it's a function)
-    pattern4 = r'^([a-zA-Z_][a-zA-Z0-9_]*)$'
-    match4 = re.search(pattern4, value)
+    match4 = _BARE_NAME_RE.search(value)
     if match4:
         func_name = match4.group(1)
-        return func_name, []
+        return func_name, ()
     
-    return None, []
+    return None, ()
+
+# Schema fields copied onto graph nodes and edges. Plain attribute reads over these are much cheaper
+# than a generic model_dump per node, and the schemas only hold flat values.
+_NODE_FIELDS = tuple(FlowchartNodeSchema.model_fields)
+_EDGE_ATTR_FIELDS = tuple(name for name in FlowchartEdgeSchema.model_fields if name not in ('sourceId', 'targetId'))
 
-def create_graph_from_flowchart_data(data: FlowchartDataSchema) -> nx.DiGraph:
+def create_graph_from_flowchart_data(data: FlowchartDataSchema, graph: Optional[nx.DiGraph] = None) -> nx.DiGraph:
     """
     Constructs a NetworkX DiGraph from FlowchartDataSchema.
 
@@ -62,15 +78,23 @@ def create_graph_from_flowchart_data(data: FlowchartDataSchema) -> nx.DiGraph:
 
     Args:
         data: An instance of FlowchartDataSchema containing nodes and edges.
+        graph: Optional graph to clear and fill instead of allocating a new one,
+            e.g. when many flowcharts are processed one after another.
 
     Returns:
         A NetworkX DiGraph object representing the flowchart.
     """
-    graph = nx.DiGraph()
+    if graph is None:
+        graph = nx.DiGraph()
+    else:
+        graph.clear()
 
+    # Nodes and edges are collected first and inserted with NetworkX's bulk methods,
+    # which avoids the per-call overhead of add_node/add_edge
+    nodes_to_add: List[Tuple[str, Dict[str, Any]]] = []
     for node_data in data.nodes:
-        # Convert Pydantic model to dict for attributes, excluding None values
-        node_attrs: Dict[str, Any] = node_data.model_dump(exclude_none=True)
+        # Copy the fields into a dict for attributes, excluding None values
+        node_attrs: Dict[str, Any] = {name: value for name in _NODE_FIELDS if (value := getattr(node_data, name)) is not None}
         
         # Normalize the node type for consistent analysis downstream
         normalized_type = normalize_node_type(
@@ -84,27 +108,33 @@ def create_graph_from_flowchart_data(data: FlowchartDataSchema) -> nx.DiGraph:
         if normalized_type == 'subroutine':
             func_name, params = parse_subroutine_info(node_data.value or '')
             node_attrs['subroutine_name'] = func_name
-            node_attrs['subroutine_params'] = params
+            # Stored as a list, as the code generators expect
+            node_attrs['subroutine_params'] = list(params)
         
         # The node ID for NetworkX will be the 'id' field from the Pydantic model.
         # All other fields become attributes of the node in the graph.
-        graph.add_node(node_data.id, **node_attrs)
+        nodes_to_add.append((node_data.id, node_attrs))
+    graph.add_nodes_from(nodes_to_add)
+
+    # Edge endpoints are checked against a plain set rather than through graph.has_node
+    node_ids = frozenset(graph)
 
+    edges_to_add: List[Tuple[str, str, Dict[str, Any]]] = []
     for edge_data in data.edges:
-        # Convert Pydantic model to dict for attributes, excluding None values
-        edge_attrs: Dict[str, Any] = edge_data.model_dump(exclude_none=True)
-        # Remove sourceId and targetId from attributes as they define the edge itself
-        edge_attrs.pop('sourceId', None)
-        edge_attrs.pop('targetId', None)
+        # Copy the fields into a dict for attributes, excluding None values
+        # (sourceId and targetId are left out of _EDGE_ATTR_FIELDS as they define the edge itself)
+        edge_attrs: Dict[str, Any] = {name: value for name in _EDGE_ATTR_FIELDS if (value := getattr(edge_data, name)) is not None}
         
         # Check if source and target nodes exist in the graph before adding edge
         # Also ensure sourceId and targetId are not None before using them
-        if edge_data.sourceId and edge_data.targetId and \
-           graph.has_node(edge_data.sourceId) and graph.has_node(edge_data.targetId):
-            graph.add_edge(edge_data.sourceId, edge_data.targetId, **edge_attrs)
+        source_id = edge_data.sourceId
+        target_id = edge_data.targetId
+        if source_id and target_id and source_id in node_ids and target_id in node_ids:
+            edges_to_add.append((source_id, target_id, edge_attrs))
         else:
-            # Handle missing nodes or missing sourceId/targetId
-            print(f"Warning: Skipping edge ID {edge_data.id} due to missing source/target node or ID. "
-                  f"Source: {edge_data.sourceId}, Target: {edge_data.targetId}")
+            # Handle missing nodes or missing sourceId/targetId; formatted only if the warning is emitted
+            logger.warning("Skipping edge ID %s due to missing source/target node or ID. Source: %s, Target: %s",
+                           edge_data.id, source_id, target_id)
+    graph.add_edges_from(edges_to_add)
 
     return graph 
\ No newline at end of file
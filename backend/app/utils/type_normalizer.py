@@ -1,4 +1,6 @@
+from functools import lru_cache
 from typing import Optional
+import re
 
 # Define canonical types for flowchart nodes to ensure consistency.
 CANONICAL_START = "start"
@@ -10,9 +12,53 @@ CANONICAL_OUTPUT = "output"
 CANONICAL_SUBROUTINE = "subroutine"
 CANONICAL_UNKNOWN = "process"  # Default for unrecognized shapes.
 
+# Sets for the existing-type fallbacks, so membership is a hash lookup rather than a list scan
+_START_END_TYPES = frozenset((CANONICAL_START, CANONICAL_END))
+_CANONICAL_TYPES = frozenset((
+    CANONICAL_START, CANONICAL_END, CANONICAL_PROCESS, CANONICAL_DECISION,
+    CANONICAL_INPUT, CANONICAL_OUTPUT, CANONICAL_SUBROUTINE
+))
+
+# Keywords in a node's text that mark it as a subroutine, matched in one regex scan instead of one scan per keyword.
+# Each keyword must start a word, so that e.g. the "int " at the end of "print x" does not count.
+_SUBROUTINE_KEYWORDS_RE = re.compile(
+    r'\b(?:function|subroutine|procedure|method|invoke|(?:def|void|int|float|double|string|call) )'
+)
+
+# Shape families recognized in node styles, in order of precedence.
+_SHAPE_DECISION = "decision"
+_SHAPE_PARALLELOGRAM = "parallelogram"
+_SHAPE_ELLIPSE = "ellipse"
+_SHAPE_RECTANGLE = "rectangle"
+
+@lru_cache(maxsize=256)
+def _shape_of_style(style: str) -> Optional[str]:
+    """
+    Returns the shape family named in a style string, or None.
+    Memoized, since a flowchart reuses the same few style strings for most of its nodes.
+    """
+    style_lower = style.lower()
+
+    # Decision nodes are typically rhombus or diamond shapes.
+    if "rhombus" in style_lower or "diamond" in style_lower:
+        return _SHAPE_DECISION
+    # Input/Output nodes are often represented by parallelograms.
+    if "parallelogram" in style_lower:
+        return _SHAPE_PARALLELOGRAM
+    # Start/End nodes are typically ellipses.
+    if "ellipse" in style_lower:
+        return _SHAPE_ELLIPSE
+    # Process nodes are usually rectangles.
+    if "rect" in style_lower or "rounded" in style_lower or "square" in style_lower:
+        return _SHAPE_RECTANGLE
+    return None
+
+@lru_cache(maxsize=2048)
 def normalize_node_type(style: Optional[str], value: Optional[str], existing_type: Optional[str]) -> str:
     """
     Normalizes a flowchart node's type based on its style, value, and existing type.
+    Memoized, since nodes copied within a flowchart or resubmitted after an edit repeat the same arguments;
+    normalize_node_type.cache_clear() resets the cache.
 
     The logic prioritizes specific keywords in the node's style string, which often
     contains shape information like 'ellipse' or 'rhombus'. It falls back to checking
@@ -31,29 +77,22 @@ def normalize_node_type(style: Optional[str], value: Optional[str], existing_typ
         # If style is missing, fall back to existing type or default to unknown
         return existing_type if existing_type else CANONICAL_UNKNOWN
 
-    style_lower = style.lower()
     value_lower = value.lower() if value else ""
 
     # Subroutine nodes can be identified by keywords in their text
     # Look for function definition patterns like "function name(params)" or "def name" or "void name()"
     if value_lower:
-        subroutine_patterns = [
-            "function", "def ", "void ", "int ", "float ", "double ", "string ",
-            "subroutine", "procedure", "method", "call ", "invoke"
-        ]
-        # Check for function-like patterns with parentheses
-        has_parentheses = "(" in value_lower and ")" in value_lower
-        has_subroutine_keyword = any(pattern in value_lower for pattern in subroutine_patterns)
-        
-        if has_subroutine_keyword or has_parentheses:
+        # Check for function-like patterns with parentheses first, as it is the cheaper test
+        if ("(" in value_lower and ")" in value_lower) or _SUBROUTINE_KEYWORDS_RE.search(value_lower):
             return CANONICAL_SUBROUTINE
 
-    # Decision nodes are typically rhombus or diamond shapes.
-    if "rhombus" in style_lower or "diamond" in style_lower:
+    # The style's shape is classified once per distinct style string
+    shape = _shape_of_style(style)
+
+    if shape == _SHAPE_DECISION:
         return CANONICAL_DECISION
 
-    # Input/Output nodes are often represented by parallelograms.
-    if "parallelogram" in style_lower:
+    if shape == _SHAPE_PARALLELOGRAM:
         if "input" in value_lower or "read" in value_lower or "get" in value_lower:
             return CANONICAL_INPUT
         if "output" in value_lower or "print" in value_lower or "display" in value_lower:
@@ -61,24 +100,22 @@ def normalize_node_type(style: Optional[str], value: Optional[str], existing_typ
         # Default to input if shape is parallelogram but text is ambiguous
         return CANONICAL_INPUT
 
-    # Start/End nodes are typically ellipses.
-    if "ellipse" in style_lower:
+    if shape == _SHAPE_ELLIPSE:
         if "start" in value_lower:
             return CANONICAL_START
         if "end" in value_lower or "stop" in value_lower:
             return CANONICAL_END
         # If frontend has already typed it as start/end, respect that.
-        if existing_type in [CANONICAL_START, CANONICAL_END]:
+        if existing_type in _START_END_TYPES:
             return existing_type
         # If it's an ellipse with no other info, assume it's a start node.
         return CANONICAL_START
 
-    # Process nodes are usually rectangles.
-    if "rect" in style_lower or "rounded" in style_lower or "square" in style_lower:
+    if shape == _SHAPE_RECTANGLE:
         return CANONICAL_PROCESS
     
     # If a known type is already provided, use it as a fallback.
-    if existing_type in [CANONICAL_START, CANONICAL_END, CANONICAL_PROCESS, CANONICAL_DECISION, CANONICAL_INPUT, CANONICAL_OUTPUT, CANONICAL_SUBROUTINE]:
+    if existing_type in _CANONICAL_TYPES:
         return existing_type
 
     # Default to process for any other unrecognized shapes.